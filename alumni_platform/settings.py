@@ -4,7 +4,7 @@ Django settings for alumni_platform project.
 
 from pathlib import Path
 import os
-from decouple import config  # pyright: ignore[reportMissingImports]
+from decouple import config, Csv  # pyright: ignore[reportMissingImports]
 # import firebase_admin
 # from firebase_admin import firestore
 
@@ -39,11 +39,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main_app.middleware.HealthCheckMiddleware',
+    'main_app.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'main_app.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main_app.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -52,7 +56,8 @@ ROOT_URLCONF = 'alumni_platform.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # The stock backend, plus render timing for MetricsMiddleware
+        'BACKEND': 'main_app.metrics.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -76,6 +81,125 @@ DATABASES = {
     }
 }
 
+
+def database_from_url(url):
+    """Build a DATABASES entry from an SQLite path or a postgres:// URL"""
+    from urllib.parse import urlparse, unquote
+
+    if not url.startswith(('postgres://', 'postgresql://')):
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / url}
+    parts = urlparse(url)
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': parts.path.lstrip('/'),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': parts.hostname or '',
+        'PORT': str(parts.port or ''),
+    }
+
+
+# Read replicas, e.g. DATABASE_REPLICA_URLS=db_replica.sqlite3,postgres://user:pw@replica/alumni
+# Each one is registered as replica1, replica2, ... and used by the router below.
+DATABASE_REPLICAS = []
+for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv()), start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = database_from_url(url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['main_app.db_router.PrimaryReplicaRouter']
+
+# Seconds a session keeps reading from the primary after a write (read-your-writes)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Cache
+# CACHE_BACKEND: locmem (default, per process), file, or redis (needs the `redis`
+# package; any Redis-protocol server works, e.g. a local redis-server/valkey).
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'alumni-connect'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'alumni',
+    }
+}
+# Namespace version counters (main_app/cache.py) must be seen by every worker
+# process, or a bump in one never invalidates what the others cached. With
+# locmem they are kept in a file cache instead, shared by the processes of one
+# host; use redis when running on several hosts.
+CACHES['versions'] = dict(CACHES['default'])
+if CACHE_BACKEND == 'locmem':
+    CACHES['versions'].update({
+        'BACKEND': CACHE_BACKENDS['file'][0],
+        'LOCATION': config('CACHE_VERSIONS_LOCATION', default=str(BASE_DIR / 'cache' / 'versions')),
+    })
+
+# Async dashboards: serve alumni/admin dashboards from main_app.async_views,
+# which run their independent queries concurrently on a bounded thread pool.
+ASYNC_DASHBOARDS = config('ASYNC_DASHBOARDS', default=False, cast=bool)
+ASYNC_QUERY_WORKERS = config('ASYNC_QUERY_WORKERS', default=8, cast=int)
+# Live seat counts on the events page (server-sent events, one query per tick per process)
+EVENT_CAPACITY_POLL_SECONDS = config('EVENT_CAPACITY_POLL_SECONDS', default=2, cast=float)
+# Each stream is closed after this long and the browser reconnects (ends abandoned streams)
+EVENT_CAPACITY_STREAM_SECONDS = config('EVENT_CAPACITY_STREAM_SECONDS', default=300, cast=int)
+
+# Sessions
+# SESSION_BACKEND: db (default), cached_db (cache in front of the table), cache
+# (cache only; needs a shared cache such as redis) or signed_cookies (no server
+# storage at all). The user's role is stored in the session at login.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='db')
+SESSION_ENGINE = SESSION_BACKENDS[SESSION_BACKEND]
+
+# Authentication (main_app/auth.py loads the profile together with the user)
+AUTHENTICATION_BACKENDS = ['main_app.auth.ProfileModelBackend']
+
+# Password hashing cost. PASSWORD_HASHER picks the hasher for new hashes
+# (pbkdf2, argon2 with `pip install argon2-cffi`, or bcrypt with `pip install bcrypt`);
+# the others stay listed so existing hashes still verify and are upgraded on login.
+# PBKDF2 cost is linear in PASSWORD_PBKDF2_ITERATIONS (Django's default, 600000,
+# takes ~0.3-0.5 s of CPU per login); lowering it trades brute-force resistance for
+# login throughput. Measure with `python manage.py bench_auth`.
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=600000, cast=int)
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'main_app.auth.TunedPBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Rate limits for login/register/payment webhook ('<count>/<s|m|h>' per key).
+# RATELIMIT_BACKEND: local (token bucket per process) or cache (shared via the
+# default cache; use redis so all processes see the same counters).
+RATELIMIT_ENABLED = config('RATELIMIT_ENABLED', default=True, cast=bool)
+RATELIMIT_BACKEND = config('RATELIMIT_BACKEND', default='local')
+# Only behind a reverse proxy that sets X-Forwarded-For itself. The client is
+# the entry RATELIMIT_TRUSTED_PROXY_COUNT places from the right: the one your
+# outermost proxy appended (entries further left are whatever the client sent).
+RATELIMIT_TRUST_X_FORWARDED_FOR = config('RATELIMIT_TRUST_X_FORWARDED_FOR', default=False, cast=bool)
+RATELIMIT_TRUSTED_PROXY_COUNT = config('RATELIMIT_TRUSTED_PROXY_COUNT', default=1, cast=int)
+RATE_LIMITS = {
+    'login:ip': config('RATE_LIMIT_LOGIN_IP', default='30/m'),
+    'login:username': config('RATE_LIMIT_LOGIN_USERNAME', default='10/m'),
+    'register:ip': config('RATE_LIMIT_REGISTER_IP', default='10/m'),
+    'payment_webhook:ip': config('RATE_LIMIT_WEBHOOK_IP', default='600/m'),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,6 +229,18 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed, minified copies plus .gz/.br variants
+# (brotli is optional); PrecompressedStaticMiddleware serves them with
+# far-future immutable cache headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'main_app.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -119,3 +255,56 @@ LOGOUT_REDIRECT_URL = 'welcome'
 # Stripe Configuration
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='pk_test_your_key_here')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='sk_test_your_key_here')
+STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='whsec_your_webhook_secret_here')
+
+# Email (use django.core.mail.backends.locmem/filebased.EmailBackend to try notifications locally)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Alumni Connect <noreply@alumniconnect.local>')
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=200, cast=int)
+
+# Internships without an application deadline expire this long after posting
+# (python manage.py expire_listings, e.g. every minute from cron)
+INTERNSHIP_MAX_AGE_DAYS = config('INTERNSHIP_MAX_AGE_DAYS', default=90, cast=int)
+
+# Student recommendations (python manage.py refresh_recommendations)
+RECOMMENDATIONS_PER_KIND = config('RECOMMENDATIONS_PER_KIND', default=10, cast=int)
+
+# Columnar analytics snapshots (python manage.py export_alumni_snapshot)
+ANALYTICS_SNAPSHOT_DIR = config('ANALYTICS_SNAPSHOT_DIR', default=str(BASE_DIR / 'analytics'))
+
+# Background job queue (python manage.py run_worker)
+JOB_RETRY_BASE_SECONDS = config('JOB_RETRY_BASE_SECONDS', default=10, cast=int)
+JOB_RETRY_MAX_SECONDS = config('JOB_RETRY_MAX_SECONDS', default=3600, cast=int)
+JOB_LOCK_TIMEOUT_SECONDS = config('JOB_LOCK_TIMEOUT_SECONDS', default=600, cast=int)
+
+# Load balancer probes (answered by HealthCheckMiddleware, see main_app/health.py)
+HEALTH_LIVENESS_PATH = config('HEALTH_LIVENESS_PATH', default='/healthz')
+HEALTH_READINESS_PATH = config('HEALTH_READINESS_PATH', default='/readyz')
+# Also round-trip the cache on readiness (worth it with a shared cache such as redis)
+HEALTH_CHECK_CACHE = config('HEALTH_CHECK_CACHE', default=False, cast=bool)
+
+# Prometheus metrics (needs prometheus-client). With several worker processes set
+# PROMETHEUS_MULTIPROC_DIR to a directory shared by them, emptied on every restart.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_PATH = config('METRICS_PATH', default='/metrics')
+# Scraper addresses allowed to read METRICS_PATH (empty: anyone)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+
+# Log main_app progress (job queue, notification throughput) to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'main_app': {'handlers': ['console'], 'level': config('APP_LOG_LEVEL', default='INFO')},
+    },
+}
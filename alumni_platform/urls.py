@@ -7,8 +7,10 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # main_app first: its admin/dashboard/, admin/events/, ... pages would
+    # otherwise be swallowed by the Django admin's catch-all view.
     path('', include('main_app.urls')),
+    path('admin/', admin.site.urls),
 ]
 
 if settings.DEBUG:
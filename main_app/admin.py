@@ -1,7 +1,9 @@
 from django.contrib import admin
 from .models import (
     Profile, Alumni, Student, CollegeAdmin, Event, EventRegistration,
-    Mentorship, Internship, Donation, MentorshipSession
+    Mentorship, Internship, Donation, MentorshipSession,
+    ArchivedEvent, ArchivedEventRegistration, ArchivedMentorship, ArchivedMentorshipSession, Job,
+    Recommendation
 )
 
 @admin.register(Profile)
@@ -65,3 +67,38 @@ class MentorshipSessionAdmin(admin.ModelAdmin):
     list_display = ['mentorship', 'session_date', 'duration_hours']
     list_filter = ['session_date']
     search_fields = ['mentorship__topic']
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(admin.ModelAdmin):
+    list_display = ['title', 'event_date', 'venue', 'created_by', 'archived_at']
+    list_filter = ['event_date', 'archived_at']
+    search_fields = ['title', 'venue', 'description']
+
+@admin.register(ArchivedEventRegistration)
+class ArchivedEventRegistrationAdmin(admin.ModelAdmin):
+    list_display = ['event', 'alumni', 'student', 'registration_date', 'payment_status']
+    list_filter = ['payment_status', 'registration_date']
+
+@admin.register(ArchivedMentorship)
+class ArchivedMentorshipAdmin(admin.ModelAdmin):
+    list_display = ['mentor', 'student', 'topic', 'status', 'end_date', 'archived_at']
+    list_filter = ['status', 'archived_at']
+    search_fields = ['topic', 'description']
+
+@admin.register(ArchivedMentorshipSession)
+class ArchivedMentorshipSessionAdmin(admin.ModelAdmin):
+    list_display = ['mentorship', 'session_date', 'duration_hours']
+    list_filter = ['session_date']
+    search_fields = ['mentorship__topic']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'run_at', 'locked_by', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+
+@admin.register(Recommendation)
+class RecommendationAdmin(admin.ModelAdmin):
+    list_display = ['student', 'rank', 'internship', 'event', 'score', 'computed_at']
+    list_select_related = ['student__profile__user', 'internship', 'event']
+    search_fields = ['student__profile__user__username']
@@ -0,0 +1,182 @@
+"""
+Admin analytics over an in-memory columnar dataset.
+
+Each process keeps the alumni columns of snapshot.py (memory-mapped from
+the latest export when there is one, otherwise read once from the
+database) plus the mentor and status of every live mentorship. Charts
+are plain NumPy reductions over those arrays (bincount over dictionary
+codes, histograms), so a page view costs a few milliseconds and no
+GROUP BY queries.
+
+The dataset checks the 'alumni' and 'mentorships' cache namespace
+versions (one cache read) on every use:
+
+- alumni changed: only the alumni logged in the ChangeLog since the
+  dataset's position are re-read and patched in; when a newer snapshot
+  has been exported (and its log entries consumed) it is reloaded first.
+  A dataset (or export) older than the log's retention is read in full,
+  which also prunes the log
+- mentorships changed: the two mentorship columns are re-read (one small
+  values_list query)
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.utils import timezone
+
+from . import snapshot
+from .cache import get_versions
+from .db_router import PRIMARY_DB
+from .models import Alumni, Mentorship
+
+NAMESPACES = ('alumni', 'mentorships')
+TOP_COMPANIES = 15
+CGPA_BIN = 0.5
+MAX_EXPERIENCE = 20
+MENTORSHIP_STATUSES = [code for code, _ in Mentorship.STATUS_CHOICES]
+ACTIVE_STATUSES = ('pending', 'active')
+
+
+class AlumniDataset:
+    """Per-process columnar copy of the alumni directory and mentorships"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.columns = None
+        self.categories = None
+        self.position = 0
+        self.read_at = None
+        self.mentors = np.empty(0, dtype=np.int64)
+        self.statuses = np.empty(0, dtype=np.int8)
+        self.summary = None
+
+    def current(self):
+        """Refresh whatever changed and return the summary charts"""
+        versions = get_versions(NAMESPACES)
+        if versions == self.versions and self.summary is not None:
+            return self.summary
+        with self.lock:
+            if versions != self.versions or self.summary is None:
+                started = time.perf_counter()
+                if self.columns is None or versions.get('alumni') != self.versions.get('alumni'):
+                    self._refresh_alumni()
+                if self.summary is None or versions.get('mentorships') != self.versions.get('mentorships'):
+                    self._refresh_mentorships()
+                self.summary = summarize(self)
+                self.summary['refreshed_ms'] = (time.perf_counter() - started) * 1000
+                self.versions = versions
+        return self.summary
+
+    def _refresh_alumni(self):
+        read_at = timezone.now()
+        upto = snapshot.last_change()
+        exported = snapshot.load_snapshot()
+        if exported is not None and (self.columns is None or exported.manifest['last_change'] > self.position) \
+                and snapshot.log_covers(snapshot.read_time(exported.manifest), read_at):
+            # Start over from the export: the log entries it consumed are gone.
+            self.columns, self.categories = exported.columns, exported.categories
+            self.position, self.read_at = exported.manifest['last_change'], snapshot.read_time(exported.manifest)
+        elif self.columns is None or not snapshot.log_covers(self.read_at, read_at):
+            self.categories = {}
+            self.columns = snapshot.read_columns(Alumni.objects.all(), self.categories)
+            self.position, self.read_at = upto, read_at
+            # Keeps the log small when exports don't run.
+            snapshot.prune_changes(read_at)
+        self.categories = {name: list(values) for name, values in self.categories.items()}
+        self.columns, _ = snapshot.apply_changes(
+            self.columns, self.categories, snapshot.changed_alumni(self.position, upto, self.read_at),
+        )
+        self.position, self.read_at = max(self.position, upto), read_at
+
+    def _refresh_mentorships(self):
+        # The primary: the namespace version may move before a replica catches up.
+        rows = list(Mentorship.objects.using(PRIMARY_DB).values_list('mentor_id', 'status'))
+        status_index = {status: code for code, status in enumerate(MENTORSHIP_STATUSES)}
+        self.mentors = np.array([row[0] for row in rows], dtype=np.int64)
+        self.statuses = np.array([status_index.get(row[1], -1) for row in rows], dtype=np.int8)
+
+
+def top_categories(codes, categories, limit):
+    """[(value, count)] of the `limit` most frequent non-empty values"""
+    counts = np.bincount(codes, minlength=len(categories))
+    if '' in categories:
+        counts[categories.index('')] = 0
+    order = np.argsort(counts, kind='stable')[::-1][:limit]
+    return [(categories[code], int(counts[code])) for code in order if counts[code]]
+
+
+def summarize(dataset):
+    """All admin charts from the dataset arrays"""
+    columns, categories = dataset.columns, dataset.categories
+    total = len(columns['id'])
+    branches = categories.get('branch', [])
+    branch_codes = np.asarray(columns['branch'])
+    is_mentor = np.asarray(columns['is_mentor'])
+
+    # branch x batch year heatmap
+    years, year_index = np.unique(columns['batch_year'], return_inverse=True)
+    heatmap = np.bincount(branch_codes * len(years) + year_index,
+                          minlength=len(branches) * len(years)).reshape(len(branches), len(years))
+
+    # Mentor coverage: share of alumni who mentor, and how many mentors are busy, per branch
+    alumni_per_branch = np.bincount(branch_codes, minlength=len(branches))
+    mentors_per_branch = np.bincount(branch_codes, weights=is_mentor, minlength=len(branches)).astype(int)
+    active = np.isin(dataset.statuses, [MENTORSHIP_STATUSES.index(status) for status in ACTIVE_STATUSES])
+    mentor_rows = np.searchsorted(columns['id'], dataset.mentors[active])
+    found = mentor_rows < total
+    found[found] = np.asarray(columns['id'])[mentor_rows[found]] == dataset.mentors[active][found]
+    mentees = np.bincount(mentor_rows[found], minlength=total)
+    busy_per_branch = np.bincount(branch_codes, weights=(mentees > 0) & is_mentor, minlength=len(branches)).astype(int)
+
+    coverage = []
+    for code, branch in enumerate(branches):
+        alumni, mentors, busy = int(alumni_per_branch[code]), int(mentors_per_branch[code]), int(busy_per_branch[code])
+        coverage.append({
+            'branch': branch,
+            'alumni': alumni,
+            'mentors': mentors,
+            'mentor_ratio': mentors / alumni if alumni else 0,
+            'busy_mentors': busy,
+            'busy_ratio': busy / mentors if mentors else 0,
+        })
+
+    cgpa_edges = np.arange(0, 10 + CGPA_BIN, CGPA_BIN)
+    cgpa_counts = np.bincount(np.minimum((np.asarray(columns['cgpa']) / CGPA_BIN).astype(int), len(cgpa_edges) - 2),
+                              minlength=len(cgpa_edges) - 1)
+    experience_counts = np.bincount(np.clip(columns['work_experience'], 0, MAX_EXPERIENCE), minlength=MAX_EXPERIENCE + 1)
+
+    companies = top_categories(columns['current_company'], categories.get('current_company', []), TOP_COMPANIES)
+    return {
+        'total_alumni': total,
+        'total_mentors': int(is_mentor.sum()),
+        'mentorship_status': dict(zip(MENTORSHIP_STATUSES, np.bincount(
+            dataset.statuses[dataset.statuses >= 0], minlength=len(MENTORSHIP_STATUSES)).tolist())),
+        'companies': companies,
+        'companies_max': max((count for _, count in companies), default=0),
+        'heatmap': {
+            'years': years.tolist(),
+            # (branch, [(count, share of the busiest cell)]) for colouring the cells
+            'rows': [
+                (branch, list(zip(counts.tolist(), np.round(counts / max(heatmap.max(initial=0), 1), 2).tolist())))
+                for branch, counts in zip(branches, heatmap)
+            ],
+        },
+        'coverage': coverage,
+        'cgpa_histogram': [(float(edge), int(count)) for edge, count in zip(cgpa_edges, cgpa_counts)],
+        'cgpa_max': int(cgpa_counts.max(initial=0)),
+        'experience_histogram': list(enumerate(experience_counts.tolist())),
+        'experience_max': int(experience_counts.max(initial=0)),
+    }
+
+
+alumni_dataset = AlumniDataset()
+
+
+def analytics_summary():
+    """The analytics summary and how long this call took (ms)"""
+    started = time.perf_counter()
+    summary = alumni_dataset.current()
+    return summary, (time.perf_counter() - started) * 1000
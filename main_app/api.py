@@ -0,0 +1,333 @@
+"""
+Read-only JSON API (v1) for the mobile client.
+
+    GET /api/v1/<resource>/            list, newest/next first
+    GET /api/v1/<resource>/<id>/       one object
+
+Resources: alumni, events, internships, mentorships (the user's own, all
+for admins) and donations (the alumni's own, all for admins).
+
+- ?fields=a,b selects the returned fields; the list is turned into a
+  values_list() query over just those columns, so no model instances are
+  built and unrequested joins are skipped
+- pages are cut with an opaque keyset cursor (?after=..., see `next` in
+  the response) and ?limit= (at most MAX_PAGE_SIZE)
+- responses carry ETags from the cache namespace versions (see
+  conditional.py), so unchanged data is answered with 304, and are
+  gzipped when the client accepts it
+"""
+
+import base64
+import json
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_safe
+
+from .auth import session_role
+from .conditional import listing_etag
+from .models import Alumni, Donation, Event, EventRegistration, Mentorship
+from .search import full_text_filter, open_internships
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+JSON_PARAMS = {'separators': (',', ':')}
+
+
+class Resource:
+    """How one model is exposed: fields (API name -> ORM path), order and scope"""
+
+    def __init__(self, queryset, fields, order, namespaces, filters=(), scope=None, search=None, time_bucket=None,
+                 relations=None, by_id=None):
+        self.queryset = queryset
+        # Rows reachable by id (detail, expansions) may be wider than the list, e.g. past events.
+        self.by_id = by_id or queryset
+        self.fields = fields
+        self.order_field, self.descending = order.lstrip('-'), order.startswith('-')
+        self.namespaces = namespaces
+        self.filters = filters
+        self.scope = scope
+        self.search = search
+        self.time_bucket = time_bucket
+        # API field holding a foreign key -> resource it points to
+        self.relations = relations or {}
+
+    @property
+    def model(self):
+        return self.queryset().model
+
+    def visible(self, request, by_id=False):
+        """Rows `request.user` may read, or None if the role has no access at all"""
+        queryset = self.by_id() if by_id else self.queryset()
+        if self.scope is None:
+            return queryset
+        lookup = self.scope.get(session_role(request))
+        if lookup is None:
+            return None
+        return queryset.filter(**{lookup: request.user}) if lookup else queryset
+
+
+def _upcoming_events():
+    return Event.objects.filter(is_active=True, event_date__gte=timezone.now())
+
+
+RESOURCES = {
+    'alumni': Resource(
+        lambda: Alumni.objects.all(),
+        {
+            'id': 'pk',
+            'first_name': 'profile__user__first_name',
+            'last_name': 'profile__user__last_name',
+            'batch_year': 'batch_year',
+            'branch': 'branch',
+            'current_company': 'current_company',
+            'current_position': 'current_position',
+            'work_experience': 'work_experience',
+            'linkedin_profile': 'linkedin_profile',
+            'github_profile': 'github_profile',
+            'is_mentor': 'is_mentor',
+            'mentor_rate_per_student': 'mentor_rate_per_student',
+        },
+        order='pk', namespaces=('alumni',), filters=('batch_year', 'branch', 'is_mentor'),
+    ),
+    'events': Resource(
+        _upcoming_events,
+        {
+            'id': 'pk',
+            'title': 'title',
+            'description': 'description',
+            'event_date': 'event_date',
+            'venue': 'venue',
+            'registration_fee': 'registration_fee',
+            'max_participants': 'max_participants',
+        },
+        order='event_date', namespaces=('events',), time_bucket=60, by_id=lambda: Event.objects.all(),
+    ),
+    'internships': Resource(
+        open_internships,
+        {
+            'id': 'pk',
+            'company_name': 'company_name',
+            'position': 'position',
+            'description': 'description',
+            'requirements': 'requirements',
+            'duration_months': 'duration_months',
+            'stipend': 'stipend',
+            'location': 'location',
+            'contact_email': 'contact_email',
+            'min_semester': 'min_semester',
+            'application_deadline': 'application_deadline',
+            'posted_by': 'posted_by_id',
+            'posted_at': 'posted_at',
+        },
+        order='-posted_at', namespaces=('internships',), filters=('duration_months', 'min_semester'),
+        search=full_text_filter, time_bucket=3600, relations={'posted_by': 'alumni'},
+    ),
+    'mentorships': Resource(
+        lambda: Mentorship.objects.all(),
+        {
+            'id': 'pk',
+            'mentor': 'mentor_id',
+            'student': 'student_id',
+            'topic': 'topic',
+            'description': 'description',
+            'status': 'status',
+            'start_date': 'start_date',
+            'end_date': 'end_date',
+            'hours_per_month': 'hours_per_month',
+            'payment_status': 'payment_status',
+            'created_at': 'created_at',
+        },
+        order='-created_at', namespaces=('mentorships',), filters=('status',),
+        scope={'alumni': 'mentor__profile__user', 'student': 'student__profile__user', 'admin': ''},
+        relations={'mentor': 'alumni'},
+    ),
+    'donations': Resource(
+        lambda: Donation.objects.all(),
+        {
+            'id': 'pk',
+            'donor': 'donor_id',
+            'amount': 'amount',
+            'purpose': 'purpose',
+            'donation_date': 'donation_date',
+            'is_verified': 'is_verified',
+        },
+        order='-donation_date', namespaces=('donations',), filters=('is_verified',),
+        scope={'alumni': 'donor__profile__user', 'admin': ''},
+        relations={'donor': 'alumni'},
+    ),
+    'registrations': Resource(
+        lambda: EventRegistration.objects.all(),
+        {
+            'id': 'pk',
+            'event': 'event_id',
+            'alumni': 'alumni_id',
+            'student': 'student_id',
+            'registration_date': 'registration_date',
+            'payment_status': 'payment_status',
+        },
+        order='-registration_date', namespaces=('registrations',), filters=('event', 'payment_status'),
+        scope={'alumni': 'alumni__profile__user', 'student': 'student__profile__user', 'admin': ''},
+        relations={'event': 'events', 'alumni': 'alumni'},
+    ),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def _error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def resolve(request, name, by_id=False):
+    """(Resource, rows the user may read) for resource `name`, or ApiError"""
+    if name not in RESOURCES:
+        raise ApiError('Unknown resource.', 404)
+    resource = RESOURCES[name]
+    queryset = resource.visible(request, by_id=by_id)
+    if queryset is None:
+        raise ApiError('Not allowed for your role.', 403)
+    return resource, queryset
+
+
+def _model_field(model, name):
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def encode_cursor(value, pk):
+    """Opaque cursor pointing just after the row with ordering `value` and `pk`"""
+    # isoformat() keeps the microseconds DjangoJSONEncoder would round off.
+    value = value.isoformat() if hasattr(value, 'isoformat') else value
+    raw = json.dumps([value, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(resource, cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, pk = json.loads(raw)
+        return _model_field(resource.model, resource.order_field).to_python(value), int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError, ValidationError):
+        raise ApiError('Invalid cursor.')
+
+
+def selected_fields(resource, requested):
+    """API field names listed in `requested` ('a,b' as in ?fields=; all fields when empty)"""
+    if not requested:
+        return list(resource.fields)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown or not names:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(resource.fields)}.")
+    return list(dict.fromkeys(names))
+
+
+def apply_filters(resource, queryset, params):
+    """Narrow `queryset` by the resource's filters (and ?q= search) present in `params`"""
+    for name in resource.filters:
+        if name in params:
+            field = _model_field(resource.model, resource.fields.get(name, name))
+            try:
+                value = field.to_python(params[name])
+            except ValidationError:
+                raise ApiError(f'Invalid value for {name}.')
+            queryset = queryset.filter(**{resource.fields.get(name, name): value})
+    if resource.search and params.get('q'):
+        queryset = resource.search(queryset, params['q'])
+    return queryset
+
+
+def page_size(value):
+    try:
+        limit = int(value or PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise ApiError('limit must be an integer.')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def fetch_page(resource, queryset, names, after=None, limit=PAGE_SIZE):
+    """Rows for `names` as dicts plus the cursor of the next page (or None)"""
+    order, pk = resource.order_field, 'pk'
+    if after is not None:
+        value, last_pk = after
+        beyond = 'lt' if resource.descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{order}__{beyond}': value}) | Q(**{order: value, f'pk__{beyond}': last_pk})
+        )
+    prefix = '-' if resource.descending else ''
+    queryset = queryset.order_by(f'{prefix}{order}', f'{prefix}pk')
+    # The ordering columns ride along at the end of each row for the cursor.
+    columns = [resource.fields[name] for name in names] + [order, pk]
+    rows = list(queryset.values_list(*columns)[:limit + 1])
+    next_cursor = encode_cursor(*rows[limit - 1][-2:]) if len(rows) > limit else None
+    return [dict(zip(names, row)) for row in rows[:limit]], next_cursor
+
+
+def _api_etag(request, resource, pk=None):
+    if resource not in RESOURCES:
+        return None
+    spec = RESOURCES[resource]
+    return listing_etag(*spec.namespaces, time_bucket=spec.time_bucket)(request)
+
+
+def api_view(view_func):
+    """JSON errors, authentication, GET/HEAD only, ETag/304 and gzip for an API view"""
+    @wraps(view_func)
+    def wrapped(request, resource, **kwargs):
+        if not request.user.is_authenticated:
+            return _error('Authentication required.', 401)
+        try:
+            spec, queryset = resolve(request, resource, by_id='pk' in kwargs)
+            return view_func(request, spec, queryset, **kwargs)
+        except ApiError as error:
+            return _error(error.detail, error.status)
+
+    conditional = condition(etag_func=_api_etag)(wrapped)
+
+    @wraps(view_func)
+    def validated(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        if response.status_code >= 400:
+            # Errors must not be cached and revalidated into a 304.
+            del response['ETag']
+        return response
+
+    validated = cache_control(private=True, no_cache=True)(validated)
+    return gzip_page(require_safe(validated))
+
+
+@api_view
+def resource_list(request, resource, queryset):
+    names = selected_fields(resource, request.GET.get('fields'))
+    after = request.GET.get('after')
+    results, next_cursor = fetch_page(
+        resource, apply_filters(resource, queryset, request.GET), names,
+        after=decode_cursor(resource, after) if after else None, limit=page_size(request.GET.get('limit')),
+    )
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['after'] = next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+    return JsonResponse({'results': results, 'next': next_url},
+                        encoder=DjangoJSONEncoder, json_dumps_params=JSON_PARAMS)
+
+
+@api_view
+def resource_detail(request, resource, queryset, pk):
+    names = selected_fields(resource, request.GET.get('fields'))
+    row = queryset.filter(pk=pk).values_list(*[resource.fields[name] for name in names]).first()
+    if row is None:
+        return _error('Not found.', 404)
+    return JsonResponse(dict(zip(names, row)), encoder=DjangoJSONEncoder, json_dumps_params=JSON_PARAMS)
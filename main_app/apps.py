@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class MainAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main_app'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401  (connects receivers, registers job tasks)
+        from .search import create_search_index
+        post_migrate.connect(create_search_index, sender=self, dispatch_uid='internship-search-index')
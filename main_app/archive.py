@@ -0,0 +1,172 @@
+"""
+Archival of finished mentorships and past events into cold tables.
+
+Hot tables (Mentorship, MentorshipSession, Event, EventRegistration) only
+keep rows the live views care about. Finished rows are copied into the
+Archived* tables and deleted from the hot tables in small transactions,
+keeping their primary keys so history stays addressable.
+"""
+
+import heapq
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+from operator import attrgetter
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .mentorship_hours import hours_tracking_paused
+from .models import (
+    Event, EventRegistration, Mentorship, MentorshipSession,
+    ArchivedEvent, ArchivedEventRegistration, ArchivedMentorship, ArchivedMentorshipSession
+)
+
+FINISHED_MENTORSHIP_STATUSES = ('completed', 'cancelled')
+HISTORY_PAGE_SIZE = 25
+
+
+def _cutoff(months):
+    return timezone.now() - timedelta(days=30 * months)
+
+
+def _copy(instance, archive_model, **overrides):
+    """Build an unsaved archive row carrying the same concrete field values"""
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+    }
+    values.update(overrides)
+    return archive_model(**values)
+
+
+def _archive_in_batches(queryset, archive_batch, batch_size):
+    """Feed primary keys of queryset to archive_batch, one transaction per batch"""
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                queryset.select_for_update().order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            archive_batch(ids)
+        total += len(ids)
+
+
+def archivable_mentorships(months):
+    """Completed/cancelled mentorships that ended (or were created) more than `months` ago"""
+    cutoff = _cutoff(months)
+    return Mentorship.objects.filter(status__in=FINISHED_MENTORSHIP_STATUSES).filter(
+        Q(end_date__lt=cutoff.date()) | Q(end_date__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def archivable_events(months):
+    """Events that took place, or were deactivated and created, more than `months` ago"""
+    cutoff = _cutoff(months)
+    return Event.objects.filter(Q(event_date__lt=cutoff) | Q(is_active=False, created_at__lt=cutoff))
+
+
+def _archive_mentorship_batch(ids):
+    mentorships = Mentorship.objects.filter(pk__in=ids)
+    sessions = MentorshipSession.objects.filter(mentorship_id__in=ids)
+    ArchivedMentorship.objects.bulk_create(_copy(m, ArchivedMentorship) for m in mentorships)
+    ArchivedMentorshipSession.objects.bulk_create(_copy(s, ArchivedMentorshipSession) for s in sessions)
+    # The sessions move, they aren't cancelled: keep them in the monthly hour totals.
+    with hours_tracking_paused():
+        sessions.delete()
+    Mentorship.objects.filter(pk__in=ids).delete()
+
+
+def _archive_event_batch(ids):
+    events = Event.objects.filter(pk__in=ids)
+    registrations = EventRegistration.objects.filter(event_id__in=ids)
+    ArchivedEvent.objects.bulk_create(_copy(e, ArchivedEvent) for e in events)
+    ArchivedEventRegistration.objects.bulk_create(_copy(r, ArchivedEventRegistration) for r in registrations)
+    registrations.delete()
+    Event.objects.filter(pk__in=ids).delete()
+
+
+def archive_mentorships(months=6, batch_size=500):
+    """Move finished mentorships (and their sessions) older than `months` to the archive"""
+    return _archive_in_batches(archivable_mentorships(months), _archive_mentorship_batch, batch_size)
+
+
+def archive_events(months=6, batch_size=500):
+    """Move past events (and their registrations) older than `months` to the archive"""
+    return _archive_in_batches(archivable_events(months), _archive_event_batch, batch_size)
+
+
+class MergedHistory:
+    """A hot queryset and its archive counterpart read as one ordered sequence.
+
+    Both are ordered by `order_by` (a field name, optionally prefixed with
+    '-', then the primary key) in the database. len() counts both tables
+    and a slice reads only up to its end from each and merges them, so a
+    Paginator page never loads the whole history.
+    """
+
+    def __init__(self, hot, cold, order_by):
+        field = order_by.lstrip('-')
+        self.descending = order_by.startswith('-')
+        pk_order = '-pk' if self.descending else 'pk'
+        self.hot = hot.order_by(order_by, pk_order)
+        self.cold = cold.order_by(order_by, pk_order)
+        self.key = attrgetter(field, 'pk')
+        self._count = None
+
+    def _merge(self, hot, cold):
+        return heapq.merge(hot, cold, key=self.key, reverse=self.descending)
+
+    def count(self):
+        if self._count is None:
+            self._count = self.hot.count() + self.cold.count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return self._merge(self.hot.iterator(), self.cold.iterator())
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None:
+            return list(islice(iter(self), start, None, index.step))
+        return list(islice(self._merge(self.hot[:stop], self.cold[:stop]), start, stop, index.step))
+
+
+def read_through(hot, cold, order_by):
+    """Merge a hot queryset with its archive counterpart (see MergedHistory)"""
+    return MergedHistory(hot, cold, order_by)
+
+
+def mentorship_history(**filters):
+    """All mentorships matching filters, live and archived, newest first"""
+    return read_through(
+        Mentorship.objects.filter(**filters).select_related('mentor__profile__user', 'student__profile__user'),
+        ArchivedMentorship.objects.filter(**filters).select_related('mentor__profile__user', 'student__profile__user'),
+        '-created_at',
+    )
+
+
+def event_history(**filters):
+    """All events matching filters, live and archived, newest first, with their registration_count"""
+    return read_through(
+        Event.objects.filter(**filters).annotate(registration_count=Count('eventregistration')),
+        ArchivedEvent.objects.filter(**filters).annotate(registration_count=Count('eventregistration_set')),
+        '-created_at',
+    )
+
+
+def mentorship_status_counts():
+    """[{'status', 'count'}] over live and archived mentorships, like mentorship_history() lists them"""
+    counts = Counter()
+    for model in (Mentorship, ArchivedMentorship):
+        for row in model.objects.values('status').annotate(count=Count('id')).order_by():
+            counts[row['status']] += row['count']
+    return [{'status': status, 'count': counts[status]} for status in sorted(counts)]
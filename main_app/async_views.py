@@ -0,0 +1,125 @@
+"""
+Async versions of the dashboard views.
+
+The dashboards run several independent reads. Django's async ORM still
+executes queries one at a time on a single thread, so these views hand the
+independent reads to a bounded thread pool and await them together. They
+are wired in place of the sync dashboards when ASYNC_DASHBOARDS is on and
+are best served by an ASGI server (see run_asgi.py).
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.db import DatabaseError, connections
+from django.shortcuts import redirect, render
+
+from .cache import fragments_cached, get_or_compute_coalesced
+from .models import Alumni, CollegeAdmin, Donation, Internship, Mentorship
+from .views import ADMIN_STATS_NAMESPACES, ADMIN_STATS_QUERIES
+
+_query_pool = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_WORKERS, thread_name_prefix='dashboard-query')
+
+# {% cache %} panels of alumni/dashboard.html and the namespaces they vary on
+ALUMNI_PANELS = {
+    'alumni_stats': ('donations', 'internships', 'mentorships'),
+    'alumni_donations': ('donations',),
+    'alumni_internships': ('internships',),
+    'alumni_mentorships': ('mentorships', 'students'),
+}
+
+
+def _run_query(query):
+    # Pool threads keep their database connections between requests (so at
+    # most ASYNC_QUERY_WORKERS extra connections); a connection is only
+    # dropped after an error, and reopened by the next query.
+    try:
+        return query()
+    except DatabaseError:
+        for conn in connections.all(initialized_only=True):
+            conn.close()
+        raise
+
+
+async def gather_queries(**queries):
+    """Run independent sync ORM callables concurrently; return {name: result}"""
+    loop = asyncio.get_running_loop()
+    futures = [
+        # copy_context() carries the replica pinning state into the pool thread
+        loop.run_in_executor(_query_pool, copy_context().run, _run_query, query)
+        for query in queries.values()
+    ]
+    return dict(zip(queries, await asyncio.gather(*futures)))
+
+
+def run_concurrently(**queries):
+    """Sync counterpart of gather_queries() for code already off the event loop"""
+    futures = {name: _query_pool.submit(copy_context().run, _run_query, query) for name, query in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def async_login_required(view_func):
+    """login_required for async views (resolves request.user off the event loop)"""
+    @wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapped
+
+
+@async_login_required
+async def alumni_dashboard(request):
+    """Alumni dashboard (recent-activity queries run concurrently)"""
+    try:
+        alumni = await Alumni.objects.select_related('profile__user').aget(profile__user=request.user)
+    except Alumni.DoesNotExist:
+        await sync_to_async(messages.error)(request, 'Alumni profile not found.')
+        return redirect('welcome')
+
+    context = {
+        'alumni': alumni,
+        'recent_donations': Donation.objects.filter(donor=alumni).order_by('-donation_date')[:5],
+        'recent_internships': Internship.objects.filter(posted_by=alumni).order_by('-posted_at')[:5],
+        'mentorship_sessions': Mentorship.objects.filter(mentor=alumni).select_related('student__profile__user').order_by('-created_at')[:5],
+    }
+
+    # Only evaluate the querysets if some panel actually has to be rendered.
+    if not await sync_to_async(fragments_cached)(ALUMNI_PANELS, request.user.pk):
+        context.update(await gather_queries(
+            recent_donations=lambda: list(context['recent_donations']),
+            recent_internships=lambda: list(context['recent_internships']),
+            mentorship_sessions=lambda: list(context['mentorship_sessions']),
+        ))
+
+    return await sync_to_async(render)(request, 'alumni/dashboard.html', context)
+
+
+@async_login_required
+async def admin_dashboard(request):
+    """Admin dashboard (stat aggregates run concurrently)"""
+    try:
+        admin = await CollegeAdmin.objects.select_related('profile__user').aget(profile__user=request.user)
+    except CollegeAdmin.DoesNotExist:
+        await sync_to_async(messages.error)(request, 'Admin profile not found.')
+        return redirect('welcome')
+
+    # Called lazily by the template (in the render thread) on a fragment miss.
+    def stats():
+        return get_or_compute_coalesced(
+            'admin_dashboard_stats', ADMIN_STATS_NAMESPACES, lambda: run_concurrently(**ADMIN_STATS_QUERIES)
+        )
+
+    context = {
+        'admin': admin,
+        'stats': stats,
+    }
+
+    return await sync_to_async(render)(request, 'admin/dashboard.html', context)
@@ -0,0 +1,65 @@
+"""
+Authentication helpers: a profile-aware login backend, the user's role
+kept in the session, and a PBKDF2 hasher with a configurable cost.
+
+With SESSION_BACKEND=cached_db or signed_cookies (see settings) and the
+role stored at login, role checks such as the dashboard redirect need no
+database read at all.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from .models import Profile
+
+SESSION_ROLE_KEY = '_user_role'
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend that loads the user's profile in the same query"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.select_related('profile').get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Run the hasher once anyway so unknown usernames take as long as known ones.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+
+def set_session_role(request, role):
+    """Remember the logged-in user's role (profile.user_type) in the session"""
+    request.session[SESSION_ROLE_KEY] = role
+
+
+def session_role(request):
+    """The user's role from the session, falling back to (and caching) the profile"""
+    if not request.user.is_authenticated:
+        return None
+    role = request.session.get(SESSION_ROLE_KEY)
+    if role is None:
+        # Sessions created before the role was stored at login.
+        role = Profile.objects.filter(user=request.user).values_list('user_type', flat=True).first()
+        if role is not None:
+            set_session_role(request, role)
+    return role
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """pbkdf2_sha256 with the iteration count taken from PASSWORD_PBKDF2_ITERATIONS.
+
+    Keeps the algorithm name, so existing hashes still verify; Django
+    re-hashes them with the configured cost on the user's next login.
+    """
+
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
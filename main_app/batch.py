@@ -0,0 +1,222 @@
+"""
+Composite API endpoint: a whole dashboard in one round trip.
+
+POST /api/v1/batch/ takes a JSON list of sub-requests and answers them
+all at once:
+
+    {"requests": [
+        {"key": "me", "resource": "profile"},
+        {"key": "mentorships", "resource": "mentorships", "fields": "id,topic,status,mentor",
+         "limit": 5, "expand": {"mentor": "first_name,last_name"}},
+        {"key": "registrations", "resource": "registrations", "limit": 5, "expand": ["event"]},
+        {"key": "alumni", "resource": "alumni", "ids": [3, 7]}
+    ]}
+
+List sub-requests take the same fields/filters/limit/after as the list
+endpoint (see api.py). Lookups by `ids` and `expand`ed foreign keys go
+through a DataLoader-style Loader: ids wanted from the same resource by
+any sub-request are collected first and fetched with a single pk__in
+query, so N mentorships pointing at the same few mentors cost one extra
+query, not N. Identical sub-requests are answered once.
+
+The endpoint never writes, so it is exempt from CSRF like a GET.
+"""
+
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_POST
+
+from .api import (
+    JSON_PARAMS, RESOURCES, ApiError, _error, apply_filters, decode_cursor, fetch_page, page_size, resolve,
+    selected_fields,
+)
+from .auth import session_role
+from .models import Alumni, CollegeAdmin, Student
+
+MAX_SUB_REQUESTS = 20
+MAX_IDS = 200
+
+# role -> (model, profile fields) for the "profile" pseudo-resource
+PROFILE_FIELDS = {
+    'alumni': (Alumni, ('id', 'batch_year', 'branch', 'current_company', 'current_position', 'work_experience',
+                        'is_mentor', 'mentor_rate_per_student', 'max_students_per_month')),
+    'student': (Student, ('id', 'batch_year', 'branch', 'current_semester', 'cgpa', 'college_name')),
+    'admin': (CollegeAdmin, ('id', 'college_name', 'college_id', 'designation')),
+}
+
+
+class Loader:
+    """Collects ids per resource, then fetches each resource's rows with one query"""
+
+    def __init__(self, request):
+        self.request = request
+        self.wanted = defaultdict(set)   # resource -> ids
+        self.fields = defaultdict(set)   # resource -> API field names
+        self.rows = defaultdict(dict)    # resource -> {id: row}
+
+    def want(self, name, ids, names):
+        self.wanted[name].update(ids)
+        self.fields[name].update(names)
+
+    def load(self):
+        for name, ids in self.wanted.items():
+            names = self.fields[name] | {'id'}
+            loaded = self.rows[name]
+            # Rows fetched in an earlier round may lack fields asked for since.
+            ids = {pk for pk in ids if pk not in loaded or not names <= loaded[pk].keys()}
+            if not ids:
+                continue
+            resource, queryset = resolve(self.request, name, by_id=True)
+            names = sorted(names)
+            columns = [resource.fields[field] for field in names]
+            for row in queryset.filter(pk__in=ids).values_list(*columns):
+                row = dict(zip(names, row))
+                self.rows[name][row['id']] = row
+        self.wanted.clear()
+
+    def get(self, name, pk, names):
+        row = self.rows[name].get(pk)
+        return None if row is None else {field: row[field] for field in names}
+
+
+def _expansions(resource, expand):
+    """{API field: (target resource name, field names)} from a sub-request's `expand`"""
+    if not expand:
+        return {}
+    if isinstance(expand, list):
+        expand = {field: None for field in expand}
+    if not isinstance(expand, dict):
+        raise ApiError('expand must be a list or an object.')
+    expansions = {}
+    for field, fields in expand.items():
+        if field not in resource.relations:
+            raise ApiError(f"Cannot expand {field}. Expandable: {', '.join(resource.relations) or 'none'}.")
+        target = resource.relations[field]
+        expansions[field] = (target, selected_fields(RESOURCES[target], fields))
+    return expansions
+
+
+def profile_payload(request):
+    """The user and their role profile (the "profile" pseudo-resource)"""
+    role = session_role(request)
+    user = request.user
+    payload = {'username': user.username, 'first_name': user.first_name, 'last_name': user.last_name,
+               'email': user.email, 'role': role}
+    if role in PROFILE_FIELDS:
+        model, fields = PROFILE_FIELDS[role]
+        payload[role] = model.objects.filter(profile__user=user).values(*fields).first()
+    return payload
+
+
+class SubRequest:
+    """One entry of the batch, answered in three phases around the Loader rounds"""
+
+    def __init__(self, request, spec):
+        if not isinstance(spec, dict) or not spec.get('resource'):
+            raise ApiError('Each request needs a resource.')
+        self.request = request
+        self.spec = spec
+        self.name = spec['resource']
+        self.rows = None
+        self.result = None
+        if self.name == 'profile':
+            return
+        self.ids = spec.get('ids')
+        if self.ids is not None:
+            if not isinstance(self.ids, list) or len(self.ids) > MAX_IDS:
+                raise ApiError(f'ids must be a list of at most {MAX_IDS} ids.')
+            try:
+                self.ids = [int(pk) for pk in self.ids]
+            except (TypeError, ValueError):
+                raise ApiError('ids must be integers.')
+        self.resource, self.queryset = resolve(request, self.name, by_id=self.ids is not None)
+        self.names = selected_fields(self.resource, spec.get('fields'))
+        self.expansions = _expansions(self.resource, spec.get('expand'))
+        self.names += [field for field in self.expansions if field not in self.names]
+
+    def start(self, loader):
+        """Run the list query, or queue the lookups by id"""
+        if self.name == 'profile':
+            self.result = profile_payload(self.request)
+        elif self.ids is not None:
+            loader.want(self.name, self.ids, self.names)
+        else:
+            filters = self.spec.get('filters') or {}
+            if not isinstance(filters, dict):
+                raise ApiError('filters must be an object.')
+            after = self.spec.get('after')
+            self.rows, next_cursor = fetch_page(
+                self.resource, apply_filters(self.resource, self.queryset, filters), self.names,
+                after=decode_cursor(self.resource, after) if after else None, limit=page_size(self.spec.get('limit')),
+            )
+            self.result = {'results': self.rows, 'after': next_cursor}
+
+    def expand(self, loader):
+        """Queue the rows the expanded foreign keys point to"""
+        if self.name == 'profile':
+            return
+        if self.ids is not None:
+            self.rows = [row for row in (loader.get(self.name, pk, self.names) for pk in self.ids) if row]
+            self.result = {'results': self.rows}
+        for field, (target, names) in self.expansions.items():
+            loader.want(target, {row[field] for row in self.rows if row[field] is not None}, names)
+
+    def finish(self, loader):
+        if self.name != 'profile':
+            for field, (target, names) in self.expansions.items():
+                for row in self.rows:
+                    if row[field] is not None:
+                        row[field] = loader.get(target, row[field], names)
+        return self.result
+
+
+@csrf_exempt
+@never_cache
+@gzip_page
+@require_POST
+def batch(request):
+    if not request.user.is_authenticated:
+        return _error('Authentication required.', 401)
+    try:
+        specs = json.loads(request.body)['requests']
+    except (ValueError, KeyError, TypeError):
+        return _error('Body must be {"requests": [...]}.', 400)
+    if not isinstance(specs, list) or not 0 < len(specs) <= MAX_SUB_REQUESTS:
+        return _error(f'Send between 1 and {MAX_SUB_REQUESTS} requests.', 400)
+
+    loader = Loader(request)
+    keys, unique, errors = {}, {}, {}
+    for index, spec in enumerate(specs):
+        key = str(spec.get('key', index)) if isinstance(spec, dict) else str(index)
+        body = {k: v for k, v in spec.items() if k != 'key'} if isinstance(spec, dict) else spec
+        dedupe = json.dumps(body, sort_keys=True, default=str)
+        try:
+            if dedupe not in unique:
+                unique[dedupe] = SubRequest(request, body)
+            keys[key] = dedupe
+        except ApiError as error:
+            errors[key] = {'status': error.status, 'detail': error.detail}
+
+    try:
+        for phase in ('start', 'expand'):
+            for dedupe, sub in list(unique.items()):
+                try:
+                    getattr(sub, phase)(loader)
+                except ApiError as error:
+                    del unique[dedupe]
+                    errors.update({key: {'status': error.status, 'detail': error.detail}
+                                   for key, value in keys.items() if value == dedupe})
+            loader.load()
+    except ApiError as error:
+        return _error(error.detail, error.status)
+
+    done = {dedupe: sub.finish(loader) for dedupe, sub in unique.items()}
+    results = {key: done[dedupe] for key, dedupe in keys.items() if dedupe in done}
+    return JsonResponse({'results': results, 'errors': errors},
+                        encoder=DjangoJSONEncoder, json_dumps_params=JSON_PARAMS)
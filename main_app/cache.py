@@ -0,0 +1,203 @@
+"""
+Namespaced, versioned caching helpers.
+
+Every cached value belongs to one or more namespaces ('alumni', 'events',
+...). Each namespace has a version number stored in the cache itself and
+the versions are baked into the cache key, so bumping a namespace (done by
+the post_save/post_delete receivers in signals.py) makes every dependent
+entry unreachable at once, without scanning or deleting keys.
+
+The versions live in the 'versions' cache, which settings.py points at a
+backend all worker processes share even when the values themselves are
+kept per process (locmem): a bump has to reach every worker.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.connection import ConnectionProxy
+
+from .metrics import record_cache_lookup
+
+KEY_PREFIX = 'ac'
+VERSIONS_CACHE = 'versions'
+
+version_cache = ConnectionProxy(caches, VERSIONS_CACHE)
+
+# Which namespaces a change to each model invalidates.
+MODEL_NAMESPACES = {
+    'User': ('alumni', 'students'),
+    'Profile': ('alumni', 'students'),
+    'Alumni': ('alumni',),
+    'Student': ('students',),
+    'CollegeAdmin': ('admins',),
+    'Event': ('events',),
+    'ArchivedEvent': ('events',),
+    'EventRegistration': ('registrations',),
+    'ArchivedEventRegistration': ('registrations',),
+    'Mentorship': ('mentorships',),
+    'ArchivedMentorship': ('mentorships',),
+    'MentorshipSession': ('mentorships',),
+    'ArchivedMentorshipSession': ('mentorships',),
+    'Internship': ('internships',),
+    'Donation': ('donations',),
+}
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:ver:{namespace}'
+
+
+def _changed_key(namespace):
+    return f'{KEY_PREFIX}:changed:{namespace}'
+
+
+def _fresh_version():
+    # Seeded from the clock so an evicted version counter never comes back
+    # at a value that old entries were written under.
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    """Return the current version of each namespace, creating missing ones"""
+    keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    found = version_cache.get_many(keys.values())
+    versions = {}
+    for namespace, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version_cache.add(key, _fresh_version(), timeout=None)
+            version = version_cache.get(key)
+        versions[namespace] = version
+    return versions
+
+
+def bump(*namespaces):
+    """Invalidate everything cached under the given namespaces"""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            version_cache.incr(key)
+        except ValueError:
+            version_cache.add(key, _fresh_version(), timeout=None)
+        version_cache.set(_changed_key(namespace), time.time(), timeout=None)
+
+
+def last_changed(namespaces):
+    """Unix time of the latest bump of any of the namespaces.
+
+    A namespace with no recorded bump (new, or its entry was evicted) counts
+    as changed now, like a missing version counts as a fresh one.
+    """
+    keys = [_changed_key(namespace) for namespace in namespaces]
+    found = version_cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            version_cache.add(key, time.time(), timeout=None)
+            found[key] = version_cache.get(key)
+    return max(found.values(), default=0)
+
+
+def bump_for_model(model):
+    """Invalidate the namespaces that depend on `model`"""
+    bump(*MODEL_NAMESPACES.get(model.__name__, ()))
+
+
+def data_version_token(namespaces):
+    """Short token that changes whenever any of the namespaces is bumped"""
+    versions = get_versions(namespaces)
+    return '.'.join(str(versions[namespace]) for namespace in namespaces)
+
+
+def fragments_cached(panels, user_pk):
+    """True if every {% cache %} panel is present for this user.
+
+    `panels` maps fragment names to the namespaces passed to
+    {% data_version %} in the template, in the same order.
+    """
+    keys = [
+        make_template_fragment_key(name, [user_pk, data_version_token(namespaces)])
+        for name, namespaces in panels.items()
+    ]
+    return len(cache.get_many(keys)) == len(keys)
+
+
+def make_key(name, namespaces, params=None):
+    """Build a cache key for `name` tied to the current namespace versions"""
+    versions = get_versions(sorted(namespaces))
+    version_part = '.'.join(f'{ns}{versions[ns]}' for ns in sorted(namespaces))
+    key = f'{KEY_PREFIX}:{name}:{version_part}'
+    if params:
+        digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:16]
+        key = f'{key}:{digest}'
+    return key
+
+
+def get_or_compute(name, namespaces, compute, params=None, timeout=DEFAULT_TIMEOUT):
+    """Return the cached value for (name, params), computing it on a miss"""
+    key = make_key(name, namespaces, params)
+    value = cache.get(key)
+    record_cache_lookup(value is not None)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def get_or_compute_coalesced(name, namespaces, compute, params=None, timeout=300,
+                             stale_timeout=60, lock_timeout=30, wait=10.0, poll_interval=0.05):
+    """Like get_or_compute(), but only one worker recomputes an expired value.
+
+    The entry is stored under a stable key together with the namespace
+    versions it was computed from and a "fresh until" timestamp:
+
+    * fresh entry: returned as is;
+    * expired, same versions (stale-while-revalidate): the worker that wins
+      the lock recomputes, everyone else gets the stale value for up to
+      `stale_timeout` seconds;
+    * missing or computed from older versions: the lock winner recomputes
+      and the others wait (up to `wait` seconds) for its result, so data
+      invalidated by a model change is never served.
+    """
+    key = make_key(name, [], params)
+    lock_key = f'{key}:lock'
+    version_tag = make_key(name, namespaces)
+
+    def fresh(entry):
+        return entry is not None and entry[0] == version_tag and entry[1] > time.time()
+
+    entry = cache.get(key)
+    if fresh(entry):
+        record_cache_lookup(True)
+        return entry[2]
+    stale = entry if entry is not None and entry[0] == version_tag else None
+    # A stale value served while another worker recomputes counts as a hit.
+    record_cache_lookup(stale is not None)
+
+    deadline = time.monotonic() + wait
+    while True:
+        if cache.add(lock_key, 1, lock_timeout):
+            try:
+                # Another worker may have refreshed the entry since we looked.
+                entry = cache.get(key)
+                if fresh(entry):
+                    return entry[2]
+                value = compute()
+                cache.set(key, (version_tag, time.time() + timeout, value), timeout + stale_timeout)
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        if stale is not None:
+            return stale[2]
+        if time.monotonic() >= deadline:
+            # The lock holder is too slow; don't fail the request.
+            return compute()
+
+        time.sleep(poll_interval)
+        entry = cache.get(key)
+        if fresh(entry):
+            return entry[2]
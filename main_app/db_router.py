@@ -0,0 +1,78 @@
+"""
+Database routing between the primary and read replicas.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY_DB = 'default'
+
+# Apps whose rows must always be read from the primary (sessions are
+# written on nearly every request and would otherwise lag behind).
+PRIMARY_ONLY_APPS = {'sessions', 'contenttypes', 'migrations'}
+
+_pinned = ContextVar('db_pinned_to_primary', default=False)
+
+
+def replica_aliases():
+    """Return the configured replica aliases"""
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', []) if alias in settings.DATABASES]
+
+
+def is_pinned():
+    """Return True if reads are currently forced onto the primary"""
+    return _pinned.get()
+
+
+def pin_to_primary():
+    """Force reads onto the primary for the rest of the current context"""
+    return _pinned.set(True)
+
+
+def unpin(token):
+    """Restore the pinning state saved by pin_to_primary()"""
+    _pinned.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Run the enclosed reads against the primary database"""
+    token = pin_to_primary()
+    try:
+        yield
+    finally:
+        unpin(token)
+
+
+class PrimaryReplicaRouter:
+    """Send writes to the primary and reads to a random replica.
+
+    Reads fall back to the primary when no replica is configured, when
+    the current request is pinned (see ReplicaPinningMiddleware) or when a
+    transaction is open on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY_DB
+        replicas = replica_aliases()
+        if not replicas or is_pinned() or connections[PRIMARY_DB].in_atomic_block:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {PRIMARY_DB, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication (or sync_replica).
+        return db not in replica_aliases()
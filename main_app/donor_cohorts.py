@@ -0,0 +1,282 @@
+"""
+Donor cohort and retention analytics.
+
+Each process keeps two donor x month matrices of verified donations
+(amount and number of gifts per donor per calendar month) plus each
+donor's batch year and branch. Cohort questions are NumPy reductions over
+those matrices:
+
+- repeat-donation rate: donors with two or more gifts, per group
+- time to second donation: months from the first to the second gift
+- lifetime value curves: average amount given within the first N months
+  after the first gift, over the donors observed for at least N months
+
+Groups are the donor's batch year, branch, or the year of their first
+gift (the acquisition cohort). Batch year and branch are read when a
+donor first appears and again on every full rebuild.
+
+All reads go to the primary: the cache version can move before a replica
+has the change, and whatever is read then is taken as synced.
+
+The matrices are built once and then patched: donation saves and deletes
+(and payment verification in tasks.py, which uses update()) are logged in
+the ChangeLog, and when the 'donations' cache namespace moves only the
+logged donations are re-read, subtracting what they counted for before.
+A process that has not synced for CHANGELOG_RETENTION rebuilds from
+scratch, and full rebuilds prune log entries older than that, so the log
+stays small. As in snapshot.py, entries logged within CHANGELOG_OVERLAP
+before the last sync are re-read too, in case they committed late.
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import get_versions
+from .db_router import PRIMARY_DB
+from .models import Alumni, ChangeLog, Donation
+from .snapshot import CHANGELOG_OVERLAP
+
+TABLE = 'donations'
+NAMESPACES = ('donations',)
+CHANGELOG_RETENTION = timedelta(days=1)
+CHUNK_SIZE = 500
+GROUPS = {
+    'batch_year': 'Batch Year',
+    'branch': 'Branch',
+    'first_year': 'First Gift Year',
+}
+LTV_HORIZONS = (1, 3, 6, 12, 24)
+# (label, first month, last month) buckets of the time to a second gift
+SECOND_GIFT_BUCKETS = (
+    ('Same month', 0, 0), ('1 month', 1, 1), ('2-3 months', 2, 3), ('4-6 months', 4, 6),
+    ('7-12 months', 7, 12), ('1-2 years', 13, 24), ('Over 2 years', 25, None),
+)
+
+
+def month_index(moment):
+    """Months since year 0 of the (local) month of a donation_date"""
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return moment.year * 12 + moment.month - 1
+
+
+def log_donation_changes(ids, deleted=False):
+    """Record donations whose verified amount may have changed"""
+    ChangeLog.objects.bulk_create(
+        ChangeLog(table=TABLE, object_id=pk, deleted=deleted) for pk in ids
+    )
+
+
+class DonorCohorts:
+    """Per-process donor x month matrices of verified donations"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.position = 0
+        self.synced_at = None
+        self.reports = {}
+        self._reset()
+
+    def _reset(self):
+        self.rows = {}                   # alumni id -> matrix row
+        self.donor_ids = np.empty(0, dtype=np.int64)
+        self.batch_years = np.empty(0, dtype=np.int16)
+        self.branch_codes = np.empty(0, dtype=np.int32)
+        self.branches = []
+        self.base = month_index(timezone.now())
+        self.amounts = np.zeros((0, 1))
+        self.counts = np.zeros((0, 1), dtype=np.int32)
+        self.counted = {}                # donation id -> (row, column, amount)
+
+    def current(self):
+        """Bring the matrices up to date; returns True if anything was re-read"""
+        versions = get_versions(NAMESPACES)
+        if versions == self.versions and self.synced_at is not None:
+            return False
+        with self.lock:
+            if versions == self.versions and self.synced_at is not None:
+                return False
+            now = timezone.now()
+            log = ChangeLog.objects.using(PRIMARY_DB).filter(table=TABLE)
+            upto = log.order_by('-pk').values_list('pk', flat=True).first() or 0
+            # The overlap re-scan reaches CHANGELOG_OVERLAP further back than the last sync.
+            if self.synced_at is None or now - self.synced_at > CHANGELOG_RETENTION - CHANGELOG_OVERLAP:
+                self._rebuild(now)
+            else:
+                recent = Q(pk__gt=self.position) | Q(changed_at__gte=self.synced_at - CHANGELOG_OVERLAP)
+                changed = set(log.filter(recent, pk__lte=upto).values_list('object_id', flat=True))
+                self._apply(changed)
+            self.position, self.synced_at, self.versions = max(self.position, upto), now, versions
+            self.reports = {}
+        return True
+
+    def _rebuild(self, now):
+        self._reset()
+        self._add(Donation.objects.using(PRIMARY_DB).filter(is_verified=True))
+        # Any process still needing older entries is overdue for a rebuild itself.
+        ChangeLog.objects.filter(table=TABLE, changed_at__lt=now - CHANGELOG_RETENTION).delete()
+
+    def _apply(self, changed):
+        """Take the changed donations out of the matrices and add back the ones still verified"""
+        removed = [self.counted.pop(pk) for pk in changed if pk in self.counted]
+        if removed:
+            rows, columns, amounts = (np.array(values) for values in zip(*removed))
+            np.subtract.at(self.amounts, (rows, columns), amounts)
+            np.subtract.at(self.counts, (rows, columns), 1)
+        ids = sorted(changed)
+        for start in range(0, len(ids), CHUNK_SIZE):
+            self._add(Donation.objects.using(PRIMARY_DB).filter(is_verified=True, pk__in=ids[start:start + CHUNK_SIZE]))
+
+    def _add(self, donations):
+        gifts = [
+            (pk, donor_id, month_index(donation_date), float(amount))
+            for pk, donor_id, donation_date, amount
+            in donations.order_by().values_list('pk', 'donor_id', 'donation_date', 'amount')
+        ]
+        if not gifts:
+            return
+        new_donors = sorted({gift[1] for gift in gifts} - self.rows.keys())
+        self._grow(len(new_donors), min(gift[2] for gift in gifts), max(gift[2] for gift in gifts))
+        for donor_id in new_donors:
+            self.rows[donor_id] = len(self.rows)
+        self.donor_ids[len(self.rows) - len(new_donors):len(self.rows)] = new_donors
+        self._read_donors(new_donors)
+
+        rows = np.array([self.rows[gift[1]] for gift in gifts])
+        columns = np.array([gift[2] for gift in gifts]) - self.base
+        amounts = np.array([gift[3] for gift in gifts])
+        np.add.at(self.amounts, (rows, columns), amounts)
+        np.add.at(self.counts, (rows, columns), 1)
+        self.counted.update(zip((gift[0] for gift in gifts), zip(rows.tolist(), columns.tolist(), amounts.tolist())))
+
+    def _grow(self, new_rows, first_month, last_month):
+        """Make room for `new_rows` more donors and the months first_month..last_month"""
+        last_month = max(last_month, month_index(timezone.now()))
+        before = max(self.base - first_month, 0)
+        after = max(last_month - (self.base + self.amounts.shape[1] - 1), 0)
+        needed = len(self.rows) + new_rows
+        extra_rows = 0
+        if needed > len(self.donor_ids):
+            # Double the row capacity so a stream of first-time donors doesn't copy the matrices each time.
+            extra_rows = max(needed, 2 * len(self.donor_ids), 64) - len(self.donor_ids)
+            self.donor_ids = np.concatenate([self.donor_ids, np.zeros(extra_rows, dtype=np.int64)])
+            self.batch_years = np.concatenate([self.batch_years, np.zeros(extra_rows, dtype=np.int16)])
+            self.branch_codes = np.concatenate([self.branch_codes, np.zeros(extra_rows, dtype=np.int32)])
+        if extra_rows or before or after:
+            padding = ((0, extra_rows), (before, after))
+            self.amounts = np.pad(self.amounts, padding)
+            self.counts = np.pad(self.counts, padding)
+        if before:
+            self.base -= before
+            self.counted = {pk: (row, column + before, amount) for pk, (row, column, amount) in self.counted.items()}
+
+    def _read_donors(self, donor_ids):
+        """(Re-)read batch year and branch of the given donors"""
+        index = {branch: code for code, branch in enumerate(self.branches)}
+        for start in range(0, len(donor_ids), CHUNK_SIZE):
+            chunk = donor_ids[start:start + CHUNK_SIZE]
+            donors = Alumni.objects.using(PRIMARY_DB).filter(pk__in=chunk)
+            for pk, batch_year, branch in donors.values_list('pk', 'batch_year', 'branch'):
+                branch = (branch or '').strip()
+                if branch not in index:
+                    index[branch] = len(self.branches)
+                    self.branches.append(branch)
+                row = self.rows[pk]
+                self.batch_years[row], self.branch_codes[row] = batch_year, index[branch]
+
+    def report(self, group_by):
+        """Cohort report grouped by one of GROUPS, cached until the next change"""
+        self.current()
+        with self.lock:
+            if group_by not in self.reports:
+                self.reports[group_by] = cohort_report(self, group_by)
+            return self.reports[group_by]
+
+
+def _groups(engine, group_by, first):
+    """(group labels, group code per donor) for the donors in `first`'s rows"""
+    size = len(first)
+    if group_by == 'branch':
+        return list(engine.branches), engine.branch_codes[:size]
+    values = engine.batch_years[:size] if group_by == 'batch_year' else (engine.base + first) // 12
+    labels, codes = np.unique(values, return_inverse=True)
+    return labels.tolist(), codes
+
+
+def cohort_report(engine, group_by):
+    """Repeat rate, time to second gift and lifetime value per group"""
+    size = len(engine.rows)
+    amounts, counts = engine.amounts[:size], engine.counts[:size]
+    donated = counts.sum(axis=1) > 0
+    first = np.argmax(counts > 0, axis=1)
+    running = np.cumsum(counts, axis=1)
+    repeat = donated & (running[:, -1] >= 2)
+    to_second = np.argmax(running >= 2, axis=1) - first
+    # Months each donor has been observed, counting the month of their first gift.
+    observed = month_index(timezone.now()) - engine.base - first + 1
+
+    # Amounts re-aligned on each donor's first gift month, then summed up to each horizon.
+    horizon = max(LTV_HORIZONS)
+    columns = first[:, None] + np.arange(horizon)
+    inside = columns < amounts.shape[1]
+    aligned = np.where(inside, amounts[np.arange(size)[:, None], np.minimum(columns, amounts.shape[1] - 1)], 0)
+    cumulative = np.cumsum(aligned, axis=1)
+
+    labels, codes = _groups(engine, group_by, first)
+    groups = len(labels)
+    donors = np.bincount(codes, weights=donated, minlength=groups).astype(int)
+    repeaters = np.bincount(codes, weights=repeat, minlength=groups).astype(int)
+    lifetime = np.bincount(codes, weights=np.where(donated, amounts.sum(axis=1), 0), minlength=groups)
+    ltv = {}
+    for months in LTV_HORIZONS:
+        eligible = donated & (observed >= months)
+        total = np.bincount(codes, weights=np.where(eligible, cumulative[:, months - 1], 0), minlength=groups)
+        donors_seen = np.bincount(codes, weights=eligible, minlength=groups)
+        ltv[months] = np.where(donors_seen > 0, total / np.maximum(donors_seen, 1), np.nan)
+
+    rows = []
+    for code, label in enumerate(labels):
+        if not donors[code]:
+            continue
+        gaps = to_second[repeat & (codes == code)]
+        rows.append({
+            'group': label,
+            'donors': int(donors[code]),
+            'repeat_donors': int(repeaters[code]),
+            'repeat_rate': repeaters[code] / donors[code],
+            'median_months_to_second': float(np.median(gaps)) if len(gaps) else None,
+            'ltv': [None if np.isnan(ltv[months][code]) else float(ltv[months][code]) for months in LTV_HORIZONS],
+            'lifetime_value': float(lifetime[code] / donors[code]),
+        })
+
+    gaps = to_second[repeat]
+    total_donors, total_repeat = int(donated.sum()), int(repeat.sum())
+    return {
+        'group_by': group_by,
+        'rows': rows,
+        'donors': total_donors,
+        'repeat_donors': total_repeat,
+        'repeat_rate': total_repeat / total_donors if total_donors else 0,
+        'median_months_to_second': float(np.median(gaps)) if len(gaps) else None,
+        'second_gift': [
+            (label, int(((gaps >= low) & (True if high is None else gaps <= high)).sum()))
+            for label, low, high in SECOND_GIFT_BUCKETS
+        ],
+        'horizons': LTV_HORIZONS,
+    }
+
+
+donor_cohorts = DonorCohorts()
+
+
+def donor_cohort_report(group_by):
+    """The cohort report for `group_by` and how long this call took (ms)"""
+    started = time.perf_counter()
+    report = donor_cohorts.report(group_by if group_by in GROUPS else 'batch_year')
+    return report, (time.perf_counter() - started) * 1000
@@ -0,0 +1,71 @@
+"""
+Expiry sweeps for internships and events.
+
+Internships expire the day after their application_deadline, or after
+INTERNSHIP_MAX_AGE_DAYS when no deadline was given; events expire once
+their event_date has passed. The sweep flips is_active in small batched
+UPDATEs so the active sets (and the partial indexes built on them) only
+hold live rows.
+
+Each batch is a single short UPDATE re-checking is_active, so concurrent
+or overlapping sweeps are harmless and the sweep can run every minute.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import bump
+from .db_router import PRIMARY_DB
+from .models import Event, Internship
+
+
+def expired_internships(now=None):
+    """Active internships whose application deadline has passed"""
+    return Internship.objects.filter(is_active=True, application_deadline__lt=timezone.localdate(now or timezone.now()))
+
+
+def stale_internships(now=None):
+    """Active internships without a deadline posted more than INTERNSHIP_MAX_AGE_DAYS ago"""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.INTERNSHIP_MAX_AGE_DAYS)
+    return Internship.objects.filter(is_active=True, application_deadline__isnull=True, posted_at__lt=cutoff)
+
+
+def expired_events(now=None):
+    """Active events that have already taken place"""
+    return Event.objects.filter(is_active=True, event_date__lt=now or timezone.now())
+
+
+def _deactivate_in_batches(queryset, batch_size, pause):
+    total = 0
+    # Pick the ids on the primary, where the UPDATEs go: a lagging replica
+    # would keep returning rows that are already deactivated.
+    queryset = queryset.using(PRIMARY_DB)
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        updated = queryset.model.objects.filter(pk__in=ids, is_active=True).update(is_active=False)
+        if not updated:
+            # Someone else (an overlapping sweep) got there first; never spin.
+            return total
+        total += updated
+        if pause:
+            time.sleep(pause)
+
+
+def expire_listings(batch_size=500, pause=0):
+    """Deactivate expired internships and events; returns (internships, events) deactivated"""
+    now = timezone.now()
+    # Two sweeps rather than one OR, so each can range-scan its own partial index.
+    internships = _deactivate_in_batches(expired_internships(now), batch_size, pause)
+    internships += _deactivate_in_batches(stale_internships(now), batch_size, pause)
+    events = _deactivate_in_batches(expired_events(now), batch_size, pause)
+    # update() sends no signals, so invalidate the cached listings here.
+    if internships:
+        bump('internships')
+    if events:
+        bump('events')
+    return internships, events
@@ -76,8 +76,10 @@ class InternshipForm(forms.ModelForm):
     class Meta:
         model = Internship
         fields = ['company_name', 'position', 'description', 'requirements', 
-                 'duration_months', 'stipend', 'location', 'contact_email']
+                 'duration_months', 'stipend', 'location', 'contact_email', 'min_semester',
+                 'application_deadline']
         widgets = {
+            'application_deadline': forms.DateInput(attrs={'type': 'date'}),
             'description': forms.Textarea(attrs={'rows': 4}),
             'requirements': forms.Textarea(attrs={'rows': 4}),
         }
@@ -111,6 +113,35 @@ class AlumniSearchForm(forms.Form):
                                  widget=forms.TextInput(attrs={'placeholder': 'Search by name or company'}))
 
 
+class InternshipSearchForm(forms.Form):
+    # Inclusive bounds on the whole-month duration_months, so no duration falls in two ranges
+    DURATION_CHOICES = [
+        ('', 'Any Duration'),
+        ('1-2', '1-2 months'),
+        ('3-5', '3-5 months'),
+        ('6-12', '6-12 months'),
+    ]
+
+    q = forms.CharField(max_length=100, required=False,
+                        widget=forms.TextInput(attrs={'placeholder': 'Company, role, skills or city'}))
+    min_stipend = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    max_stipend = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    duration = forms.ChoiceField(choices=DURATION_CHOICES, required=False,
+                                 widget=forms.Select(attrs={'class': 'form-select'}))
+
+    def search_filters(self):
+        """Keyword arguments for search.search_internships()"""
+        data = self.cleaned_data
+        filters = {
+            'query': data.get('q', ''),
+            'min_stipend': data.get('min_stipend'),
+            'max_stipend': data.get('max_stipend'),
+        }
+        if data.get('duration'):
+            filters['min_duration'], filters['max_duration'] = map(int, data['duration'].split('-'))
+        return filters
+
+
 class StudentMentorshipForm(forms.Form):
     BRANCH_CHOICES = [
         ('CSE', 'Computer Science Engineering'),
@@ -0,0 +1,106 @@
+"""
+Liveness and readiness probes for load balancers and orchestrators.
+
+HealthCheckMiddleware answers HEALTH_LIVENESS_PATH and
+HEALTH_READINESS_PATH before the rest of the middleware stack runs, so a
+probe never loads a session, resolves a URL or renders a template.
+
+- liveness: the process is up and serving; touches nothing else
+- readiness: a timed SELECT 1 on the primary and every replica, no
+  unapplied migrations, and (with HEALTH_CHECK_CACHE or ?cache=1) a cache
+  round trip. Answers 503 when any check fails, with per-check latency.
+  A replica that is down is reported ("degraded") but doesn't fail it:
+  every instance shares the replicas, so taking them all out of rotation
+  would turn one lost replica into a full outage.
+
+Failures are logged with their traceback; the response only names the
+exception class, since probes are often reachable without auth.
+
+Building the migration plan reads every migration module, so it is only
+done until it first comes back empty; migrations can't be un-applied
+under a running process.
+"""
+
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+
+from .db_router import replica_aliases
+
+logger = logging.getLogger(__name__)
+
+_migrations_applied = False
+
+
+def _timed(name, check):
+    """{'ok': bool, 'ms': float} (plus 'error') for one check function"""
+    started = time.perf_counter()
+    try:
+        result = {'ok': bool(check())}
+    except Exception as error:
+        logger.exception('Readiness check %s failed', name)
+        result = {'ok': False, 'error': type(error).__name__}
+    result['ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def check_database(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()[0] == 1
+
+
+def check_migrations():
+    global _migrations_applied
+    if not _migrations_applied:
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        _migrations_applied = not executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return _migrations_applied
+
+
+def check_cache():
+    key, token = 'health:probe', uuid.uuid4().hex
+    cache.set(key, token, 10)
+    return cache.get(key) == token
+
+
+def readiness(with_cache=False):
+    """(status, {check name: result}) for the readiness probe: 'ok', 'degraded' or 'unavailable'"""
+    required = {
+        f'database:{DEFAULT_DB_ALIAS}': lambda: check_database(DEFAULT_DB_ALIAS),
+        'migrations': check_migrations,
+    }
+    if with_cache:
+        required['cache'] = check_cache
+    optional = {f'database:{alias}': lambda alias=alias: check_database(alias) for alias in replica_aliases()}
+    checks = {name: _timed(name, check) for name, check in {**required, **optional}.items()}
+    if not all(checks[name]['ok'] for name in required):
+        return 'unavailable', checks
+    return 'ok' if all(check['ok'] for check in checks.values()) else 'degraded', checks
+
+
+def probe_response(payload, status=200):
+    response = HttpResponse(json.dumps(payload), content_type='application/json', status=status)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def liveness_response():
+    return probe_response({'status': 'ok'})
+
+
+def readiness_response(request):
+    started = time.perf_counter()
+    status, checks = readiness(with_cache=settings.HEALTH_CHECK_CACHE or request.GET.get('cache') == '1')
+    return probe_response({
+        'status': status,
+        'checks': checks,
+        'ms': round((time.perf_counter() - started) * 1000, 3),
+    }, status=503 if status == 'unavailable' else 200)
@@ -0,0 +1,113 @@
+"""
+A small durable job queue backed by the Job table.
+
+Slow side effects (payment bookkeeping, thumbnails, emails, imports) are
+enqueued from request handlers, ideally inside the same transaction as the
+write that triggers them, and executed by `python manage.py run_worker`.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it (PostgreSQL) and an atomic compare-and-set UPDATE elsewhere
+(SQLite), so any number of workers can poll the same table safely.
+Failed jobs are retried with exponential backoff.
+"""
+
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .db_router import PRIMARY_DB
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(func=None, *, name=None, max_attempts=5):
+    """Register a function as a job task: @task or @task(max_attempts=3)"""
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        func.task_name = task_name
+        func.max_attempts = max_attempts
+        TASKS[task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def enqueue(func, run_at=None, **payload):
+    """Queue a call to a registered task; payload must be JSON-serialisable"""
+    return Job.objects.create(
+        task=func.task_name,
+        payload=payload,
+        max_attempts=func.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before retry number `attempts` (exponential, jittered, capped)"""
+    delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    delay = min(delay, settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_jobs(worker_id, limit=1):
+    """Atomically take up to `limit` due jobs for this worker"""
+    now = timezone.now()
+    # Always the primary: a replica may not have the claim (or the job) yet.
+    jobs = Job.objects.using(PRIMARY_DB)
+    due = jobs.filter(status='queued', run_at__lte=now).order_by('run_at', 'id')
+    claim = {'status': 'running', 'locked_by': worker_id, 'locked_at': now, 'attempts': F('attempts') + 1}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            jobs.filter(id__in=ids).update(**claim)
+    else:
+        # Claim-by-update: only the worker whose UPDATE still sees the row
+        # as queued gets it; losers just try the next candidate.
+        ids = []
+        for job_id in due.values_list('id', flat=True)[:limit * 4]:
+            if jobs.filter(id=job_id, status='queued').update(**claim):
+                ids.append(job_id)
+                if len(ids) == limit:
+                    break
+
+    return list(jobs.filter(id__in=ids).order_by('run_at', 'id'))
+
+
+def run_job(job):
+    """Execute a claimed job and record the outcome (retry, done or failed)"""
+    func = TASKS.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {job.task!r}')
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed on attempt %s', job.pk, job.task, job.attempts)
+        if job.attempts < job.max_attempts:
+            update = {'status': 'queued', 'run_at': timezone.now() + timedelta(seconds=backoff_delay(job.attempts))}
+        else:
+            update = {'status': 'failed', 'finished_at': timezone.now()}
+        Job.objects.filter(pk=job.pk).update(last_error=error, locked_by='', locked_at=None, **update)
+        return False
+
+    Job.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now(), locked_by='', locked_at=None)
+    return True
+
+
+def requeue_stale_jobs():
+    """Put back jobs whose worker died while running them"""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    stale = Job.objects.using(PRIMARY_DB).filter(status='running', locked_at__lt=cutoff)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=timezone.now(), last_error='Worker lost while running the job'
+    )
+    return stale.update(status='queued', locked_by='', locked_at=None)
@@ -0,0 +1,156 @@
+"""
+Live event capacity over server-sent events.
+
+One CapacityFeed per server process polls the registration counts of all
+upcoming events once per EVENT_CAPACITY_POLL_SECONDS and pushes only the
+events whose numbers changed to every connected client, so N open event
+pages cost one query per tick instead of N page reloads.
+
+The stream needs an ASGI server (see run_asgi.py). Under WSGI the view
+sends a single snapshot and asks the browser to reconnect later, which
+degrades to cheap polling.
+
+Django's ASGI handler doesn't notice a client going away while a stream
+is open, so each stream ends after EVENT_CAPACITY_STREAM_SECONDS (the
+browser reconnects after its retry: delay) and each subscriber queue is
+bounded: an abandoned stream holds at most SUBSCRIBER_QUEUE_SIZE updates
+until it ends and unsubscribes.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .async_views import async_login_required, gather_queries
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 32
+RECONNECT_MS = 2000
+MAX_POLL_BACKOFF_SECONDS = 60
+
+
+def read_capacity():
+    """{event_id: (registered_count, max_participants)} for all upcoming events"""
+    rows = (
+        Event.objects.filter(is_active=True, event_date__gte=timezone.now())
+        .annotate(registered_count=Count('eventregistration'))
+        .values_list('pk', 'registered_count', 'max_participants')
+    )
+    return {pk: (registered, capacity) for pk, registered, capacity in rows}
+
+
+class CapacityFeed:
+    """Shared in-process poller fanning capacity changes out to subscriber queues"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counts = {}
+        self.subscribers = set()
+        self._task = None
+        self._loop = None
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First subscriber on this event loop (or the previous loop is gone).
+            self._loop, self._task, self.counts, self.subscribers = loop, None, {}, set()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, changed):
+        for queue in self.subscribers:
+            if queue.full():
+                # A client that stopped reading: drop its oldest update.
+                queue.get_nowait()
+            queue.put_nowait(changed)
+
+    async def _poll(self):
+        # Stops by itself once the last stream has ended.
+        failures = 0
+        while self.subscribers:
+            try:
+                counts = (await gather_queries(counts=read_capacity))['counts']
+            except Exception:
+                failures += 1
+                delay = min(self.interval * 2 ** failures, MAX_POLL_BACKOFF_SECONDS)
+                logger.exception('Capacity poll failed (%s in a row), retrying in %.0fs', failures, delay)
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            changed = {pk: value for pk, value in counts.items() if self.counts.get(pk) != value}
+            self.counts = counts
+            if changed:
+                self.publish(changed)
+            await asyncio.sleep(self.interval)
+
+
+capacity_feed = CapacityFeed(settings.EVENT_CAPACITY_POLL_SECONDS)
+
+
+def _sse(data, event='capacity'):
+    payload = {str(pk): {'registered': registered, 'max': capacity} for pk, (registered, capacity) in data.items()}
+    return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+
+
+def _visible_events(request):
+    ids = set()
+    for value in request.GET.get('events', '').split(','):
+        if value.strip().isdigit():
+            ids.add(int(value))
+    return ids
+
+
+async def _stream(event_ids):
+    queue = capacity_feed.subscribe()
+    ends_at = time.monotonic() + settings.EVENT_CAPACITY_STREAM_SECONDS
+    try:
+        yield f'retry: {RECONNECT_MS}\n\n'
+        # Clients joining mid-stream start from the feed's last snapshot;
+        # the first client gets it with the poller's first tick.
+        snapshot = {pk: value for pk, value in capacity_feed.counts.items() if pk in event_ids}
+        if snapshot:
+            yield _sse(snapshot)
+        while (remaining := ends_at - time.monotonic()) > 0:
+            try:
+                changed = await asyncio.wait_for(queue.get(), min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            changed = {pk: value for pk, value in changed.items() if pk in event_ids}
+            if changed:
+                yield _sse(changed)
+    finally:
+        capacity_feed.unsubscribe(queue)
+
+
+@async_login_required
+async def event_capacity_stream(request):
+    """text/event-stream of registered/max counts for ?events=1,2,3"""
+    event_ids = _visible_events(request)
+    if hasattr(request, 'scope'):
+        body = _stream(event_ids)
+    else:
+        # WSGI can't hold the connection open: one snapshot, then reconnect.
+        counts = (await gather_queries(counts=read_capacity))['counts']
+        retry_ms = int(settings.EVENT_CAPACITY_POLL_SECONDS * 1000 * 5)
+        body = [f'retry: {retry_ms}\n' + _sse({pk: counts[pk] for pk in event_ids if pk in counts})]
+
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
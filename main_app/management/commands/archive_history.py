@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from main_app.archive import archive_events, archive_mentorships
+
+
+class Command(BaseCommand):
+    help = 'Move finished mentorships and past events into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=6,
+                            help='Only archive rows that finished more than this many months ago')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows moved per transaction')
+
+    def handle(self, *args, **options):
+        months = options['months']
+        batch_size = options['batch_size']
+
+        mentorships = archive_mentorships(months=months, batch_size=batch_size)
+        self.stdout.write(f'Archived {mentorships} mentorships')
+
+        events = archive_events(months=months, batch_size=batch_size)
+        self.stdout.write(f'Archived {events} events')
+
+        self.stdout.write(self.style.SUCCESS('Archival completed'))
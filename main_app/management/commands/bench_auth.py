@@ -0,0 +1,110 @@
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+
+from main_app.models import Profile
+
+BENCH_USERNAME = '__bench_auth__'
+BENCH_PASSWORD = 'bench-auth-Password-1'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput and per-request session overhead under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--engines', default=','.join(settings.SESSION_BACKENDS),
+                            help='Comma separated SESSION_BACKEND names to compare')
+
+    def handle(self, *args, **options):
+        self.queries = 0
+        self.lock = threading.Lock()
+        connection_created.connect(self.count_queries)
+        for connection in connections.all(initialized_only=True):
+            connection.execute_wrappers.append(self.counter)
+
+        User.objects.filter(username=BENCH_USERNAME).delete()
+        user = User.objects.create_user(BENCH_USERNAME, password=BENCH_PASSWORD)
+        Profile.objects.create(user=user, user_type='student')
+        try:
+            self.stdout.write(f'Hasher: {settings.PASSWORD_HASHERS[0]} '
+                              f'(PBKDF2 iterations {settings.PASSWORD_PBKDF2_ITERATIONS})')
+            self.bench_logins(options)
+            for engine in options['engines'].split(','):
+                self.bench_sessions(engine.strip(), options)
+        finally:
+            User.objects.filter(username=BENCH_USERNAME).delete()
+            connection_created.disconnect(self.count_queries)
+
+    def counter(self, execute, sql, params, many, context):
+        with self.lock:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def count_queries(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self.counter)
+
+    def run(self, request, total, clients):
+        """Run `request(client)` `total` times, one thread per client; return latencies (ms) and wall time"""
+        idle = queue.SimpleQueue()
+        for client in clients:
+            idle.put(client)
+
+        def one(_):
+            client = idle.get()
+            try:
+                started = time.perf_counter()
+                request(client)
+                return (time.perf_counter() - started) * 1000
+            finally:
+                idle.put(client)
+
+        self.queries = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+            latencies = list(pool.map(one, range(total)))
+        return latencies, time.perf_counter() - started
+
+    def report(self, label, latencies, elapsed, total):
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f'{label}: {total / elapsed:.1f}/s, p50 {statistics.median(latencies):.2f} ms, '
+            f'p99 {p99:.2f} ms, {self.queries / total:.1f} queries/request'
+        )
+
+    def login(self, client):
+        response = client.post('/login/', {
+            'username': BENCH_USERNAME, 'password': BENCH_PASSWORD, 'user_type': 'student',
+        })
+        if response.status_code != 302:
+            raise CommandError(f'Login failed with status {response.status_code}')
+
+    def bench_logins(self, options):
+        clients = [Client() for _ in range(options['concurrency'])]
+        latencies, elapsed = self.run(self.login, options['logins'], clients)
+        self.report('login', latencies, elapsed, options['logins'])
+
+    def bench_sessions(self, engine, options):
+        def dashboard(client):
+            response = client.get('/dashboard/')
+            if response.status_code != 302:
+                raise CommandError(f'/dashboard/ returned {response.status_code}')
+
+        with override_settings(SESSION_ENGINE=settings.SESSION_BACKENDS[engine]):
+            clients = [Client() for _ in range(options['concurrency'])]
+            for client in clients:
+                self.login(client)
+            latencies, elapsed = self.run(dashboard, options['requests'], clients)
+            self.report(f'session {engine}', latencies, elapsed, options['requests'])
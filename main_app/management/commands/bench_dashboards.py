@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from main_app import async_views, views
+from main_app.models import Alumni, CollegeAdmin
+
+
+class Command(BaseCommand):
+    help = 'Compare cold-cache latency of the sync and async (concurrent-query) dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--query-latency-ms', type=float, default=5.0,
+                            help='Simulated per-query network latency (0 to measure the raw database)')
+
+    def handle(self, *args, **options):
+        alumni = Alumni.objects.select_related('profile__user').first()
+        admin = CollegeAdmin.objects.select_related('profile__user').first()
+        if alumni is None or admin is None:
+            raise CommandError('Needs at least one alumni and one admin; run create_demo_data.py first.')
+
+        delay = options['query_latency_ms'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(slow_query)
+
+        if delay:
+            connection.ensure_connection()
+            connection.execute_wrappers.append(slow_query)
+            connection_created.connect(add_latency)
+
+        factory = RequestFactory()
+        cases = [
+            ('alumni_dashboard', alumni.profile.user, views.alumni_dashboard, async_views.alumni_dashboard),
+            ('admin_dashboard', admin.profile.user, views.admin_dashboard, async_views.admin_dashboard),
+        ]
+        try:
+            for name, user, sync_view, async_view in cases:
+                sync_ms = self.measure(factory, user, sync_view, options['iterations'])
+                async_ms = self.measure(factory, user, async_to_sync(async_view), options['iterations'])
+                self.stdout.write(
+                    f'{name}: sync p50 {statistics.median(sync_ms):.1f} ms, '
+                    f'async p50 {statistics.median(async_ms):.1f} ms '
+                    f'({statistics.median(sync_ms) / statistics.median(async_ms):.2f}x)'
+                )
+        finally:
+            if delay:
+                connection_created.disconnect(add_latency)
+                connection.execute_wrappers.remove(slow_query)
+
+    def measure(self, factory, user, view, iterations):
+        timings = []
+        for _ in range(iterations):
+            cache.clear()  # measure the cold path: no cached fragments or aggregates
+            request = factory.get('/')
+            request.user = user
+            request.session = {}
+            started = time.perf_counter()
+            response = view(request)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{view} returned {response.status_code}')
+        return timings
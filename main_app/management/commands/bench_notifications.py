@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+
+from main_app.notifications import batched, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Measure notification throughput: one connection per message vs batched sends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE)
+        parser.add_argument('--backend', default='django.core.mail.backends.locmem.EmailBackend',
+                            help='Email backend to send through (e.g. the SMTP backend against a local test server)')
+
+    def handle(self, *args, **options):
+        recipients = [f'student{n}@example.com' for n in range(options['recipients'])]
+        subject, body = 'Throughput test', 'This is a notification throughput test.\n' * 20
+
+        started = time.perf_counter()
+        for recipient in recipients:
+            EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient],
+                         connection=get_connection(options['backend'])).send()
+        self.report('per-message connection', len(recipients), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        sent = sum(
+            send_batch(subject, body, batch, connection=get_connection(options['backend']))
+            for batch in batched(recipients, options['batch_size'])
+        )
+        self.report(f"batches of {options['batch_size']}", sent, time.perf_counter() - started)
+
+    def report(self, label, sent, elapsed):
+        self.stdout.write(f'{label}: {sent} messages in {elapsed:.2f} s ({sent / elapsed:.0f} msg/s)')
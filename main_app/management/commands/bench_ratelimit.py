@@ -0,0 +1,87 @@
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from main_app.ratelimit import local_buckets
+
+
+class Command(BaseCommand):
+    help = 'Show legitimate request latency during a login flood, with and without rate limiting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Request workers (like WSGI worker threads/processes)')
+        parser.add_argument('--flood-rate', type=float, default=40.0,
+                            help='Failed login attempts per second from one attacking IP')
+        parser.add_argument('--legit-rate', type=float, default=10.0,
+                            help='Legitimate page views per second')
+        parser.add_argument('--login-limit', default=settings.RATE_LIMITS['login:ip'],
+                            help='Per-IP login rate to test (default: RATE_LIMITS["login:ip"])')
+
+    def handle(self, *args, **options):
+        logging.getLogger('django.request').setLevel(logging.ERROR)  # one 429 warning per flood request
+        rate_limits = {**settings.RATE_LIMITS, 'login:ip': options['login_limit']}
+        for enabled in (False, True):
+            local_buckets.reset()
+            with override_settings(RATELIMIT_ENABLED=enabled, RATELIMIT_BACKEND='local', RATE_LIMITS=rate_limits):
+                legit, unserved, rejected, flood_done = self.simulate(options)
+            if legit:
+                legit.sort()
+                p99 = legit[min(len(legit) - 1, int(len(legit) * 0.99))]
+                latency = f'legitimate p50 {statistics.median(legit):.0f} ms, p99 {p99:.0f} ms'
+            else:
+                latency = 'no legitimate request served'
+            self.stdout.write(
+                f"rate limiting {'on' if enabled else 'off'}: {latency} "
+                f"({len(legit)} served, {unserved} still queued at the end); "
+                f"flood {flood_done} handled, {rejected} rejected with 429"
+            )
+
+    def simulate(self, options):
+        """Feed flood and legitimate requests into a fixed worker pool; latency includes queueing"""
+        local = threading.local()
+        lock = threading.Lock()
+        legit, counts = [], {'rejected': 0, 'flood': 0}
+
+        def client():
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            return local.client
+
+        def flood(n, queued_at):
+            response = client().post('/login/', {
+                'username': f'victim{n}', 'password': 'guess', 'user_type': 'student',
+            }, REMOTE_ADDR='203.0.113.66')
+            with lock:
+                counts['flood'] += 1
+                counts['rejected'] += response.status_code == 429
+
+        def page_view(n, queued_at):
+            client().get('/', REMOTE_ADDR=f'198.51.100.{n % 250 + 1}')
+            with lock:
+                legit.append((time.perf_counter() - queued_at) * 1000)
+
+        arrivals = sorted(
+            [(n / options['flood_rate'], flood, n) for n in range(int(options['duration'] * options['flood_rate']))]
+            + [(n / options['legit_rate'], page_view, n) for n in range(int(options['duration'] * options['legit_rate']))],
+            key=lambda arrival: arrival[0],
+        )
+        pool = ThreadPoolExecutor(max_workers=options['workers'])
+        started = time.perf_counter()
+        for offset, request, n in arrivals:
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(request, n, time.perf_counter())
+        # Give the backlog one more `duration` to drain, then drop what is left.
+        time.sleep(options['duration'])
+        pool.shutdown(wait=True, cancel_futures=True)
+        legit_total = sum(1 for _, request, _ in arrivals if request is page_view)
+        return legit, legit_total - len(legit), counts['rejected'], counts['flood']
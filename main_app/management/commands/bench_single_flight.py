@@ -0,0 +1,65 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app.cache import get_or_compute_coalesced, make_key
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent requests at an expired cached aggregate and check it is recomputed exactly once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--compute-seconds', type=float, default=0.2,
+                            help='Simulated cost of the aggregate query')
+
+    def handle(self, *args, **options):
+        concurrency = options['requests']
+        compute_seconds = options['compute_seconds']
+        name = f'bench_single_flight_{time.time_ns()}'
+        calls = []
+        calls_lock = threading.Lock()
+
+        def compute():
+            with calls_lock:
+                calls.append(1)
+            time.sleep(compute_seconds)
+            return len(calls)
+
+        for mode in ('stale', 'cold'):
+            calls.clear()
+            if mode == 'stale':
+                # Seed the entry, then let it expire into its stale window.
+                get_or_compute_coalesced(name, ['donations'], compute, timeout=0.01)
+                time.sleep(0.05)
+                calls.clear()
+            else:
+                cache.delete(make_key(name, [], None))
+
+            barrier = threading.Barrier(concurrency)
+            results = []
+            latencies = []
+
+            def request():
+                barrier.wait()
+                started = time.perf_counter()
+                results.append(get_or_compute_coalesced(name, ['donations'], compute, timeout=60))
+                latencies.append(time.perf_counter() - started)
+
+            threads = [threading.Thread(target=request) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            latencies.sort()
+            self.stdout.write(
+                f'{mode}: {concurrency} requests, {len(calls)} recomputation(s), '
+                f'p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms'
+            )
+            if len(calls) != 1:
+                raise CommandError(f'{mode}: expected exactly 1 recomputation, got {len(calls)}')
+
+        self.stdout.write(self.style.SUCCESS('Single-flight OK'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main_app.expiry import expire_listings
+
+
+class Command(BaseCommand):
+    help = 'Deactivate internships past their deadline and events that have taken place'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows deactivated per UPDATE')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches (to go easy on a busy database)')
+
+    def handle(self, *args, **options):
+        internships, events = expire_listings(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(f'Deactivated {internships} internships and {events} events')
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app.snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write a columnar (.npy) snapshot of the alumni directory for offline analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only re-read alumni changed since the previous snapshot (from the change log)')
+        parser.add_argument('--parquet', action='store_true',
+                            help='Also write alumni.parquet (requires pyarrow)')
+        parser.add_argument('--dir', help='Snapshot directory (default: ANALYTICS_SNAPSHOT_DIR)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            path, rows, reread = export_snapshot(
+                directory=options['dir'], incremental=options['incremental'], parquet=options['parquet'],
+            )
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {rows} alumni ({reread} read from the database) to {path} '
+            f'in {time.perf_counter() - started:.2f} s'
+        ))
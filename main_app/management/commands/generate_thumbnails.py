@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from main_app.cache import bump_for_model
+from main_app.models import Profile
+from main_app.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate (or regenerate) profile picture thumbnails for existing media'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of images processed in parallel')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate thumbnails that are already marked ready')
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        if not options['force']:
+            profiles = profiles.filter(thumbnails_ready=False)
+        pending = list(profiles.values_list('pk', 'profile_picture'))
+        self.stdout.write(f'Generating thumbnails for {len(pending)} profile pictures...')
+
+        def process(item):
+            pk, name = item
+            try:
+                generate_thumbnails(name)
+            except Exception as e:
+                self.stderr.write(f'  {name}: {e}')
+                return None
+            return pk
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            done = [pk for pk in executor.map(process, pending) if pk is not None]
+
+        Profile.objects.filter(pk__in=done).update(thumbnails_ready=True)
+        bump_for_model(Profile)
+        self.stdout.write(self.style.SUCCESS(f'{len(done)} done, {len(pending) - len(done)} failed'))
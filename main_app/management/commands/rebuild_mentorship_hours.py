@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main_app.mentorship_hours import rebuild_hours
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly mentorship hour totals from all (live and archived) sessions'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        buckets, drifted = rebuild_hours()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {buckets} mentorship-month totals ({drifted} had drifted) '
+            f'in {time.perf_counter() - started:.2f} s'
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main_app.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored internship/event recommendations of every student'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only recompute students whose inputs changed and merge in new items')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        recomputed, merged = refresh_recommendations(incremental=options['incremental'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {recomputed} students, merged new items for {merged} '
+            f'in {time.perf_counter() - started:.2f} s'
+        ))
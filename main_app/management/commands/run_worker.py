@@ -0,0 +1,74 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main_app.db_router import use_primary
+from main_app.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Number of worker threads')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty instead of polling forever')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: self.stopping.set())
+        signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale jobs')
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(target=self.work, args=(f'{prefix}:{n}', options), name=f'job-worker-{n}')
+            for n in range(options['concurrency'])
+        ]
+        self.stdout.write(f"Starting {len(threads)} workers ({prefix})")
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
+
+    def work(self, worker_id, options):
+        # Jobs usually act on rows written just before they were queued,
+        # which a lagging replica may not have yet.
+        with use_primary():
+            self._work(worker_id, options)
+
+    def _work(self, worker_id, options):
+        done = failed = 0
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                jobs = claim_jobs(worker_id)
+                if not jobs:
+                    if options['burst']:
+                        break
+                    self.stopping.wait(options['poll_interval'])
+                    continue
+                for job in jobs:
+                    started = time.perf_counter()
+                    ok = run_job(job)
+                    done += ok
+                    failed += not ok
+                    self.stdout.write(
+                        f"[{worker_id}] {job.task} #{job.pk} {'done' if ok else 'failed'} "
+                        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+                    )
+        finally:
+            close_old_connections()
+            self.stdout.write(f'[{worker_id}] exiting: {done} done, {failed} failed')
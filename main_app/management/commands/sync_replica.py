@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app.db_router import PRIMARY_DB, replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the SQLite replicas (local replica testing)'
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[PRIMARY_DB]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('sync_replica only works with an SQLite primary; use real replication for PostgreSQL.')
+
+        replicas = [
+            alias for alias in replica_aliases()
+            if settings.DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3'
+        ]
+        if not replicas:
+            self.stdout.write('No SQLite replicas configured (set DATABASE_REPLICA_URLS).')
+            return
+
+        source = sqlite3.connect(str(primary['NAME']))
+        try:
+            for alias in replicas:
+                target = sqlite3.connect(str(settings.DATABASES[alias]['NAME']))
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f'{alias} synced from {PRIMARY_DB}'))
+        finally:
+            source.close()
@@ -0,0 +1,209 @@
+"""
+Monthly mentorship hour totals.
+
+MentorshipMonthlyHours (per mentorship and month) and MentorMonthlyHours
+(per mentor and month) are updated in place by the MentorshipSession
+signal receivers in signals.py: a saved session adds its duration to the
+bucket of its month, an edited one moves the old duration out first, a
+deleted one subtracts it. Each change is one F() UPDATE per table, so the
+report never sums sessions.
+
+Archival moves sessions into the cold tables without counting that as a
+deletion (see hours_tracking_paused), so totals cover archived history
+too. rebuild_hours() recomputes everything from the hot and archived
+sessions in bulk (python manage.py rebuild_mentorship_hours) and reports
+how many buckets had drifted.
+"""
+
+import contextvars
+import csv
+from contextlib import contextmanager
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .db_router import PRIMARY_DB
+from .models import (
+    ArchivedMentorship, ArchivedMentorshipSession, Mentorship, MentorshipSession,
+    MentorMonthlyHours, MentorshipMonthlyHours,
+)
+
+_paused = contextvars.ContextVar('mentorship_hours_paused', default=False)
+
+
+@contextmanager
+def hours_tracking_paused():
+    """Don't adjust the totals for session changes made inside this block"""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+def tracking_paused():
+    return _paused.get()
+
+
+def month_of(moment):
+    """First day of the (local) month of a session_date"""
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return moment.date().replace(day=1)
+
+
+def _participants(mentorship_id):
+    # From the primary: the mentorship may have been created a moment ago.
+    for model in (Mentorship, ArchivedMentorship):
+        found = model.objects.using(PRIMARY_DB).filter(pk=mentorship_id).values_list('mentor_id', 'student_id').first()
+        if found:
+            return found
+    return None
+
+
+def _add(model, key, defaults, hours, sessions):
+    """Add to the bucket `key` of `model`, creating it if needed"""
+    changes = {'hours': F('hours') + hours, 'sessions': F('sessions') + sessions}
+    if model.objects.filter(**key).update(**changes) or sessions < 0 or hours < 0:
+        # Nothing to take away from a missing bucket: it was deleted along
+        # with its mentor or student (cascades delete it before the sessions).
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **defaults, hours=hours, sessions=sessions)
+    except IntegrityError:
+        # Created concurrently since our UPDATE; add to that row instead.
+        model.objects.filter(**key).update(**changes)
+
+
+def add_session_hours(mentorship_id, month, hours, sessions=1):
+    """Add `hours` (negative to remove) and a session count to both totals for `month`"""
+    participants = _participants(mentorship_id)
+    if participants is None:
+        return
+    mentor_id, student_id = participants
+    _add(MentorshipMonthlyHours, {'mentorship_id': mentorship_id, 'month': month},
+         {'mentor_id': mentor_id, 'student_id': student_id}, hours, sessions)
+    _add(MentorMonthlyHours, {'mentor_id': mentor_id, 'month': month}, {}, hours, sessions)
+
+
+def _session_totals(session_model, mentorship_model):
+    """{(mentorship_id, month): (mentor_id, student_id, hours, sessions)} from one session table"""
+    participants = dict(
+        (pk, (mentor_id, student_id))
+        for pk, mentor_id, student_id
+        in mentorship_model.objects.using(PRIMARY_DB).values_list('pk', 'mentor_id', 'student_id')
+    )
+    rows = (
+        session_model.objects.using(PRIMARY_DB)
+        .annotate(month=TruncMonth('session_date', output_field=DateField()))
+        .values('mentorship_id', 'month')
+        .annotate(hours=Sum('duration_hours'), sessions=Count('pk'))
+        .values_list('mentorship_id', 'month', 'hours', 'sessions')
+        .order_by()
+    )
+    totals = {}
+    for mentorship_id, month, hours, sessions in rows:
+        if mentorship_id in participants:
+            totals[mentorship_id, month] = (*participants[mentorship_id], hours, sessions)
+    return totals
+
+
+def rebuild_hours():
+    """Recompute both tables from all sessions; returns (buckets written, buckets that had drifted)"""
+    # Read and replace in one transaction on the primary, so neither replica
+    # lag nor sessions saved in between are lost.
+    with transaction.atomic(using=PRIMARY_DB):
+        expected = _session_totals(MentorshipSession, Mentorship)
+        expected.update(_session_totals(ArchivedMentorshipSession, ArchivedMentorship))
+        stored = {
+            (mentorship_id, month): (hours, sessions)
+            for mentorship_id, month, hours, sessions
+            in MentorshipMonthlyHours.objects.using(PRIMARY_DB).filter(sessions__gt=0)
+            .values_list('mentorship_id', 'month', 'hours', 'sessions')
+        }
+        drifted = sum(
+            1 for key in expected.keys() | stored.keys()
+            if key not in expected or key not in stored
+            or stored[key][1] != expected[key][3] or abs(stored[key][0] - expected[key][2]) > 1e-6
+        )
+
+        per_mentor = {}
+        for (_, month), (mentor_id, _, hours, sessions) in expected.items():
+            total = per_mentor.setdefault((mentor_id, month), [0.0, 0])
+            total[0] += hours
+            total[1] += sessions
+
+        MentorshipMonthlyHours.objects.all().delete()
+        MentorMonthlyHours.objects.all().delete()
+        MentorshipMonthlyHours.objects.bulk_create(
+            (MentorshipMonthlyHours(mentorship_id=mentorship_id, month=month, mentor_id=mentor_id,
+                                    student_id=student_id, hours=hours, sessions=sessions)
+             for (mentorship_id, month), (mentor_id, student_id, hours, sessions) in expected.items()),
+            batch_size=1000,
+        )
+        MentorMonthlyHours.objects.bulk_create(
+            (MentorMonthlyHours(mentor_id=mentor_id, month=month, hours=hours, sessions=sessions)
+             for (mentor_id, month), (hours, sessions) in per_mentor.items()),
+            batch_size=1000,
+        )
+    return len(expected), drifted
+
+
+def parse_month(value):
+    """date for a 'YYYY-MM' string (the current month when empty or invalid)"""
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        return date(year, month, 1)
+    except (AttributeError, ValueError):
+        return month_of(timezone.now())
+
+
+def _planned_hours(mentorship_ids):
+    planned = {}
+    for model in (ArchivedMentorship, Mentorship):
+        planned.update(model.objects.filter(pk__in=mentorship_ids).values_list('pk', 'hours_per_month'))
+    return planned
+
+
+def hours_report(month):
+    """Per-mentor and per-mentorship hours for `month`, against Mentorship.hours_per_month"""
+    mentorships = list(
+        MentorshipMonthlyHours.objects.filter(month=month, sessions__gt=0)
+        .select_related('mentor__profile__user', 'student__profile__user')
+        .order_by('mentor_id', 'mentorship_id')
+    )
+    planned = _planned_hours([row.mentorship_id for row in mentorships])
+    planned_per_mentor = {}
+    for row in mentorships:
+        row.planned_hours = planned.get(row.mentorship_id, 0)
+        row.utilisation = row.hours / row.planned_hours * 100 if row.planned_hours else None
+        planned_per_mentor[row.mentor_id] = planned_per_mentor.get(row.mentor_id, 0) + row.planned_hours
+
+    mentors = list(
+        MentorMonthlyHours.objects.filter(month=month, sessions__gt=0)
+        .select_related('mentor__profile__user')
+        .order_by('-hours')
+    )
+    for row in mentors:
+        row.planned_hours = planned_per_mentor.get(row.mentor_id, 0)
+        row.utilisation = row.hours / row.planned_hours * 100 if row.planned_hours else None
+    return mentors, mentorships
+
+
+def write_report_csv(output, month):
+    """Write the per-mentorship rows of hours_report(month) as CSV to `output`"""
+    _, mentorships = hours_report(month)
+    writer = csv.writer(output)
+    writer.writerow(['month', 'mentorship_id', 'mentor', 'student', 'sessions', 'hours', 'planned_hours',
+                     'utilisation_percent'])
+    for row in mentorships:
+        writer.writerow([
+            f'{month:%Y-%m}', row.mentorship_id,
+            row.mentor.profile.user.get_full_name(), row.student.profile.user.get_full_name(),
+            row.sessions, round(row.hours, 2), row.planned_hours,
+            '' if row.utilisation is None else round(row.utilisation, 1),
+        ])
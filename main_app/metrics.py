@@ -0,0 +1,211 @@
+"""
+Prometheus metrics per view (METRICS_ENABLED, needs prometheus-client).
+
+MetricsMiddleware times every request and labels it with the resolved
+URL name. While a request runs, its database queries (an execute wrapper
+installed on every connection as it is created, in any thread; the
+ContextVar follows the request into async_views' query pool), template
+rendering (the DjangoTemplates backend below) and get_or_compute cache
+lookups (cache.py) are added to a per-request RequestMetrics held in a
+ContextVar. After the response, each histogram gets one observation:
+
+- django_http_request_duration_seconds{view,method,status}
+- django_http_response_size_bytes{view}
+- django_db_queries_per_request{view}, django_db_query_seconds_per_request{view}
+- django_template_render_seconds{view}
+- django_cache_lookups_total{view,result}
+- django_db_queries_outside_requests_total: queries no measured request
+  ran (the capacity SSE poller, health probes)
+
+Streaming responses (the capacity SSE feed, static files) return before
+their body is produced, so their duration and size would only cover the
+time to the headers. They are only counted, in
+django_http_streaming_responses_total{view,status}.
+
+METRICS_PATH serves them in the Prometheus text format. With
+PROMETHEUS_MULTIPROC_DIR set, every worker process writes its values to
+memory-mapped files in that directory and a scrape of any worker
+aggregates all of them. Its *.db files must be removed when the server
+(re)starts.
+"""
+
+import contextvars
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+UNRESOLVED = '<unresolved>'
+DURATION_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1, 2.5, 5, 10)
+PART_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_metrics = None
+_children = {}
+
+
+class RequestMetrics:
+    """What one request spent on queries, templates and cache lookups"""
+
+    __slots__ = ('queries', 'query_seconds', 'template_seconds', 'cache_hits', 'cache_misses', 'lock')
+
+    def __init__(self):
+        self.lock = threading.Lock()  # queries may run in several threads at once
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def record_cache_lookup(hit):
+    """Count a cache hit or miss against the current request (if measured)"""
+    current = _current.get()
+    if current is not None:
+        if hit:
+            current.cache_hits += 1
+        else:
+            current.cache_misses += 1
+
+
+def time_query(execute, sql, params, many, context):
+    """connection.execute_wrappers entry adding each query to the current request"""
+    current = _current.get()
+    if current is None:
+        metrics()['outside_queries'].inc()
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        with current.lock:
+            current.queries += 1
+            current.query_seconds += elapsed
+
+
+def install_query_timer(connection, **kwargs):
+    """connection_created receiver: time the queries of every connection, whichever thread owns it"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        current = _current.get()
+        if current is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            current.template_seconds += time.perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The stock Django template backend, with render time added to the current request"""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+def multiprocess_dir():
+    return settings.PROMETHEUS_MULTIPROC_DIR or os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+
+
+def metrics():
+    """The metric objects, created on first use"""
+    global _metrics
+    if _metrics is None:
+        directory = multiprocess_dir()
+        # Read once, when prometheus_client is first imported; it switches to
+        # multiprocess mode if the variable is set at all, even to ''.
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            os.environ['PROMETHEUS_MULTIPROC_DIR'] = directory
+        else:
+            os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        try:
+            from prometheus_client import Counter, Histogram
+        except ImportError:
+            raise ImproperlyConfigured('METRICS_ENABLED requires prometheus-client (pip install prometheus-client)')
+        _metrics = {
+            'duration': Histogram('django_http_request_duration_seconds', 'Request duration by view',
+                                  ['view', 'method', 'status'], buckets=DURATION_BUCKETS),
+            'size': Histogram('django_http_response_size_bytes', 'Response body size by view',
+                              ['view'], buckets=SIZE_BUCKETS),
+            'queries': Histogram('django_db_queries_per_request', 'Database queries per request by view',
+                                 ['view'], buckets=QUERY_BUCKETS),
+            'query_seconds': Histogram('django_db_query_seconds_per_request', 'Database time per request by view',
+                                       ['view'], buckets=PART_BUCKETS),
+            'template_seconds': Histogram('django_template_render_seconds', 'Template render time per request by view',
+                                          ['view'], buckets=PART_BUCKETS),
+            'cache': Counter('django_cache_lookups', 'get_or_compute cache lookups by view and result',
+                             ['view', 'result']),
+            'outside_queries': Counter('django_db_queries_outside_requests', 'Database queries not run by a measured request'),
+            'streams': Counter('django_http_streaming_responses', 'Streaming responses started by view',
+                               ['view', 'status']),
+        }
+    return _metrics
+
+
+def _child(name, *labels):
+    """The labelled metric, memoised (labels() takes a lock and rebuilds the key every call)"""
+    key = (name, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metrics()[name].labels(*labels)
+    return child
+
+
+def observe_stream(view, status):
+    """Record one streaming response; its body hasn't been produced yet"""
+    _child('streams', view, str(status)).inc()
+
+
+def observe(view, method, status, duration, size, current):
+    """Record one finished request"""
+    _child('duration', view, method, str(status)).observe(duration)
+    _child('size', view).observe(size)
+    _child('queries', view).observe(current.queries)
+    _child('query_seconds', view).observe(current.query_seconds)
+    if current.template_seconds:
+        _child('template_seconds', view).observe(current.template_seconds)
+    if current.cache_hits:
+        _child('cache', view, 'hit').inc(current.cache_hits)
+    if current.cache_misses:
+        _child('cache', view, 'miss').inc(current.cache_misses)
+
+
+def exposition():
+    """(body, content type) of the metrics in the Prometheus text format"""
+    metrics()
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+    from prometheus_client import multiprocess
+
+    registry = REGISTRY
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def start_request():
+    current = RequestMetrics()
+    return current, _current.set(current)
+
+
+def finish_request(token):
+    _current.reset(token)
@@ -0,0 +1,242 @@
+"""
+Custom middleware for the Alumni Connect Platform.
+"""
+
+import mimetypes
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .db_router import pin_to_primary, unpin
+from .health import liveness_response, readiness_response
+from .metrics import (
+    UNRESOLVED, exposition, finish_request, install_query_timer, metrics, observe, observe_stream, start_request,
+)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+PIN_SESSION_KEY = '_db_pin_until'
+
+
+class HealthCheckMiddleware:
+    """Answer the liveness/readiness probes (see health.py) ahead of the stack.
+
+    Goes first in MIDDLEWARE: probes skip HTTPS redirects, sessions,
+    authentication and URL resolution, and never render a template.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.liveness_path = settings.HEALTH_LIVENESS_PATH
+        self.readiness_path = settings.HEALTH_READINESS_PATH
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            if request.path_info == self.liveness_path:
+                return liveness_response()
+            if request.path_info == self.readiness_path:
+                return readiness_response(request)
+        return self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Per-view request metrics and the Prometheus endpoint (see metrics.py).
+
+    Only installed with METRICS_ENABLED. Placed right after the health
+    checks so probes aren't counted but everything else is timed.
+    """
+
+    METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.path = settings.METRICS_PATH
+        self.allowed_ips = set(settings.METRICS_ALLOWED_IPS)
+        metrics()  # fail at startup, not on the first request, without prometheus-client
+        # Every connection, including those of query pool threads opened later
+        connection_created.connect(install_query_timer, dispatch_uid='metrics_query_timer')
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection)
+
+    def __call__(self, request):
+        if request.path_info == self.path and request.method in ('GET', 'HEAD'):
+            return self.serve(request)
+
+        current, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_request(token)
+
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else UNRESOLVED
+        if response.streaming:
+            # Only the time to the headers has passed; the body is produced later.
+            observe_stream(view, response.status_code)
+            return response
+        method = request.method if request.method in self.METHODS else 'other'
+        observe(view, method, response.status_code, duration, len(response.content), current)
+        return response
+
+    def serve(self, request):
+        if self.allowed_ips and request.META.get('REMOTE_ADDR') not in self.allowed_ips:
+            return HttpResponse(status=403)
+        body, content_type = exposition()
+        response = HttpResponse(body, content_type=content_type)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Keep a session on the primary database right after it writes.
+
+    Unsafe requests always read from the primary, and after a successful
+    one by a logged-in user the session is pinned for REPLICA_PIN_SECONDS
+    so they see their own writes even if the replicas are lagging.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        unsafe = request.method not in SAFE_METHODS
+        pinned = unsafe or (
+            session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+        )
+
+        token = pin_to_primary() if pinned else None
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                unpin(token)
+
+        # Only writes that happened need reading back: skip failed requests,
+        # and anonymous ones (login floods, webhooks) so they don't create a
+        # session row and cookie each.
+        user = getattr(request, 'user', None)
+        if (
+            unsafe and session is not None and response.status_code < 400
+            and user is not None and user.is_authenticated
+        ):
+            session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+        return response
+
+
+def accepted_encodings(header):
+    """Predicate telling whether an Accept-Encoding header allows a content coding (q=0 refuses it)"""
+    weights = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.strip().lower()] = weight
+    return lambda coding: weights.get(coding, weights.get('*', 0.0)) > 0
+
+
+def not_modified(if_none_match, etag):
+    """Weak If-None-Match comparison of RFC 9110 13.1.2 (a list of tags, or *)"""
+    etags = parse_etags(if_none_match)
+    if etags == ['*']:
+        return True
+    return etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in etags)
+
+
+class PrecompressedStaticMiddleware:
+    """Serve collected static files, preferring precompressed variants.
+
+    Files from STATIC_ROOT are answered before the rest of the stack runs.
+    Content-hashed names listed in the staticfiles manifest never change,
+    so they get a one-year immutable Cache-Control; anything else gets a
+    short max-age. A `.br` or `.gz` sibling written by
+    CompressedManifestStaticFilesStorage is used when the client accepts it.
+
+    Not used with DEBUG: STATIC_ROOT only changes on collectstatic, so edits
+    under static/ would be hidden behind the collected copies.
+    """
+
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    SHORT_LIVED = 'public, max-age=300'
+
+    def __init__(self, get_response):
+        if settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.root = Path(settings.STATIC_ROOT).resolve() if settings.STATIC_ROOT else None
+        self._immutable_names = None
+
+    def __call__(self, request):
+        if (
+            self.root is not None
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    @property
+    def immutable_names(self):
+        if self._immutable_names is None:
+            self._immutable_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._immutable_names
+
+    def serve(self, request, name):
+        path = (self.root / name).resolve()
+        if self.root not in path.parents or not path.is_file():
+            return None
+
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        served, encoding = path, None
+        for candidate, suffix in self.ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if accepted(candidate) and variant.is_file():
+                served, encoding = variant, candidate
+                break
+
+        stat = path.stat()
+        # One ETag per encoding: the variants are different bytes (RFC 9110 8.8.3).
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}{"-" + encoding if encoding else ""}"'
+        immutable = name in self.immutable_names
+        cache_control = self.IMMUTABLE if immutable else self.SHORT_LIVED
+        compressed = any(path.with_name(path.name + suffix).is_file() for _, suffix in self.ENCODINGS)
+        if not_modified(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = cache_control
+            if compressed:
+                response['Vary'] = 'Accept-Encoding'
+            return response
+
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        response = FileResponse(open(served, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if compressed:
+            response['Vary'] = 'Accept-Encoding'
+        response['Content-Length'] = os.path.getsize(served)
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
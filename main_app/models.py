@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 
 class Profile(models.Model):
@@ -14,6 +15,7 @@ class Profile(models.Model):
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
     phone = models.CharField(max_length=15, blank=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    thumbnails_ready = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -69,6 +71,12 @@ class Student(models.Model):
     cgpa = models.FloatField(validators=[MinValueValidator(0.0), MaxValueValidator(10.0)])
     college_name = models.CharField(max_length=200)
 
+    class Meta:
+        indexes = [
+            # Notification fan-out: students of a branch from a given semester on
+            models.Index(fields=['branch', 'current_semester'], name='student_branch_sem_idx'),
+        ]
+
     def __str__(self):
         return f"{self.profile.user.get_full_name()} - {self.branch} {self.batch_year}"
 
@@ -83,7 +91,7 @@ class CollegeAdmin(models.Model):
         return f"{self.profile.user.get_full_name()} - {self.college_name}"
 
 
-class Event(models.Model):
+class EventBase(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     event_date = models.DateTimeField()
@@ -94,12 +102,24 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    is_archived = False
+
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return self.title
 
 
-class EventRegistration(models.Model):
-    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+class Event(EventBase):
+    class Meta:
+        indexes = [
+            # Upcoming-event listings and the expiry sweep only look at active rows
+            models.Index(fields=['event_date'], name='event_active_date_idx', condition=models.Q(is_active=True)),
+        ]
+
+
+class EventRegistrationBase(models.Model):
     alumni = models.ForeignKey(Alumni, on_delete=models.CASCADE, null=True, blank=True)
     student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True)
     registration_date = models.DateTimeField(auto_now_add=True)
@@ -107,14 +127,21 @@ class EventRegistration(models.Model):
     payment_id = models.CharField(max_length=100, blank=True)
 
     class Meta:
-        unique_together = [['event', 'alumni'], ['event', 'student']]
+        abstract = True
 
     def __str__(self):
         participant = self.alumni or self.student
         return f"{participant} - {self.event.title}"
 
 
-class Mentorship(models.Model):
+class EventRegistration(EventRegistrationBase):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = [['event', 'alumni'], ['event', 'student']]
+
+
+class MentorshipBase(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('active', 'Active'),
@@ -134,10 +161,19 @@ class Mentorship(models.Model):
     payment_id = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    is_archived = False
+
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.mentor} mentoring {self.student} - {self.topic}"
 
 
+class Mentorship(MentorshipBase):
+    pass
+
+
 class Internship(models.Model):
     company_name = models.CharField(max_length=200)
     position = models.CharField(max_length=100)
@@ -147,10 +183,22 @@ class Internship(models.Model):
     stipend = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     location = models.CharField(max_length=200)
     contact_email = models.EmailField()
+    min_semester = models.IntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(8)],
+                                       help_text="Lowest semester of students who are notified")
+    application_deadline = models.DateField(null=True, blank=True,
+                                            help_text="Last day to apply; the posting is deactivated afterwards")
     posted_by = models.ForeignKey(Alumni, on_delete=models.CASCADE)
     posted_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Internship feed: newest active postings first, paged by (posted_at, id)
+            models.Index(fields=['-posted_at', '-id'], name='internship_feed_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['application_deadline'], name='internship_deadline_idx',
+                         condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return f"{self.company_name} - {self.position}"
 
@@ -167,13 +215,164 @@ class Donation(models.Model):
         return f"{self.donor} - ₹{self.amount}"
 
 
-class MentorshipSession(models.Model):
-    mentorship = models.ForeignKey(Mentorship, on_delete=models.CASCADE)
+class MentorshipSessionBase(models.Model):
     session_date = models.DateTimeField()
     duration_hours = models.FloatField()
     notes = models.TextField(blank=True)
     mentor_feedback = models.TextField(blank=True)
     student_feedback = models.TextField(blank=True)
 
+    class Meta:
+        abstract = True
+
     def __str__(self):
         return f"{self.mentorship} - {self.session_date}"
+
+
+class MentorshipSession(MentorshipSessionBase):
+    mentorship = models.ForeignKey(Mentorship, on_delete=models.CASCADE)
+
+
+class MentorshipMonthlyHours(models.Model):
+    """Session hours of one mentorship in one month, kept current by signals (see mentorship_hours.py).
+
+    mentorship_id is a plain column rather than a foreign key so the
+    totals outlive archival (archived mentorships keep their ids).
+    """
+    mentorship_id = models.BigIntegerField()
+    mentor = models.ForeignKey(Alumni, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    month = models.DateField(help_text="First day of the month")
+    hours = models.FloatField(default=0)
+    sessions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['mentorship_id', 'month'], name='mentorship_month_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'mentor'], name='mentorship_hours_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"Mentorship #{self.mentorship_id} {self.month:%Y-%m}: {self.hours}h"
+
+
+class MentorMonthlyHours(models.Model):
+    """Session hours of one mentor across all their mentorships in one month"""
+    mentor = models.ForeignKey(Alumni, on_delete=models.CASCADE)
+    month = models.DateField(help_text="First day of the month")
+    hours = models.FloatField(default=0)
+    sessions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['mentor', 'month'], name='mentor_month_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='mentor_hours_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.mentor} {self.month:%Y-%m}: {self.hours}h"
+
+
+# Archive ("cold") tables. Rows keep their original primary keys and
+# timestamps; related names mirror the hot models so templates work on both.
+
+class ArchivedEvent(EventBase):
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+
+class ArchivedEventRegistration(EventRegistrationBase):
+    id = models.BigIntegerField(primary_key=True)
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name='eventregistration_set')
+    registration_date = models.DateTimeField()
+
+
+class ArchivedMentorship(MentorshipBase):
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+
+class ArchivedMentorshipSession(MentorshipSessionBase):
+    id = models.BigIntegerField(primary_key=True)
+    mentorship = models.ForeignKey(ArchivedMentorship, on_delete=models.CASCADE, related_name='mentorshipsession_set')
+
+
+class Recommendation(models.Model):
+    """One precomputed internship or event suggestion for a student (see recommendations.py)"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='recommendations')
+    internship = models.ForeignKey(Internship, on_delete=models.CASCADE, null=True, blank=True)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'rank'], name='recommendation_student_idx'),
+        ]
+
+    @property
+    def kind(self):
+        return 'internship' if self.internship_id else 'event'
+
+    @property
+    def item_id(self):
+        return self.internship_id or self.event_id
+
+    def __str__(self):
+        return f"{self.student} - {self.kind} #{self.item_id} ({self.score:.2f})"
+
+
+class ChangeLog(models.Model):
+    """One changed or deleted row, consumed by incremental exports (see snapshot.py)"""
+    table = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['table', 'id'], name='changelog_table_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.table} #{self.object_id} ({'deleted' if self.deleted else 'changed'})"
+
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
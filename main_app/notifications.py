@@ -0,0 +1,96 @@
+"""
+Email notifications to students about new internships and events.
+
+Posting an internship or event only queues a fan-out job. The fan-out
+resolves every recipient with a single indexed query, splits them into
+batches of NOTIFICATION_BATCH_SIZE and queues one job per batch; each
+batch job renders the message once and sends the whole batch over one
+email connection (one SMTP login instead of one per student).
+
+Messages go out one at a time over that connection, so when the server
+fails part way through a batch the job knows who already got theirs:
+the retry is queued for the remaining recipients only and nobody gets
+the same email twice.
+
+Any EMAIL_BACKEND works, so the locmem and file backends can be used to
+exercise the pipeline without an SMTP server.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from .models import Event, Internship
+
+logger = logging.getLogger(__name__)
+
+
+def internship_recipients(internship):
+    """Emails of active students in the poster's branch and at least `min_semester`"""
+    return list(
+        User.objects.filter(
+            is_active=True,
+            profile__student__branch=internship.posted_by.branch,
+            profile__student__current_semester__gte=internship.min_semester,
+        ).exclude(email='').values_list('email', flat=True)
+    )
+
+
+def event_recipients(event):
+    """Emails of all active students (events are open to every branch)"""
+    return list(
+        User.objects.filter(is_active=True, profile__student__isnull=False)
+        .exclude(email='').values_list('email', flat=True)
+    )
+
+
+# kind -> (model, recipients resolver, body template, subject)
+NOTIFICATION_KINDS = {
+    'internship': (Internship, internship_recipients, 'emails/new_internship.txt',
+                   'New internship: {obj.position} at {obj.company_name}'),
+    'event': (Event, event_recipients, 'emails/new_event.txt', 'New event: {obj.title}'),
+}
+
+
+def batched(items, size):
+    """Split `items` into lists of at most `size`"""
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def render_notification(kind, obj):
+    """(subject, body) of the notification for `obj`"""
+    _, _, template, subject = NOTIFICATION_KINDS[kind]
+    body = render_to_string(template, {'object': obj, 'site_name': 'Alumni Connect'})
+    return subject.format(obj=obj), body
+
+
+class BatchSendError(Exception):
+    """Sending stopped part way through a batch; `unsent` are the recipients left"""
+
+    def __init__(self, unsent, error):
+        super().__init__(f'{len(unsent)} notifications not sent: {error}')
+        self.unsent = unsent
+
+
+def send_batch(subject, body, recipients, connection=None):
+    """Send one message per recipient over a single connection; return the number sent"""
+    connection = connection or get_connection()
+    started = time.perf_counter()
+    sent = 0
+    with connection:
+        for position, recipient in enumerate(recipients):
+            email = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient], connection=connection)
+            try:
+                sent += connection.send_messages([email]) or 0
+            except Exception as error:
+                raise BatchSendError(recipients[position:], error) from error
+    elapsed = time.perf_counter() - started
+    logger.info(
+        'Sent %s/%s notifications in %.2f s (%.0f msg/s)',
+        sent, len(recipients), elapsed, sent / elapsed if elapsed else float(sent),
+    )
+    return sent
@@ -0,0 +1,139 @@
+"""
+Rate limiting for expensive unauthenticated endpoints (login, register,
+payment webhook).
+
+Each request is checked against token buckets keyed by endpoint plus
+client IP (and, for login, the submitted username) before the view does
+any hashing or database work; excess requests get 429 with Retry-After.
+
+RATELIMIT_BACKEND selects where buckets live:
+
+- local: an in-process token bucket (per worker process, no I/O)
+- cache: the default cache, shared by every process when it is redis;
+  approximated with fixed-window counters because cache.incr() is the
+  only atomic operation all backends offer
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): `capacity` requests per `period` seconds"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+class LocalTokenBucket:
+    """Thread-safe in-process token buckets, one per key.
+
+    Buckets are kept in least-recently-used order and the oldest is dropped
+    once there are more than MAX_KEYS, so memory stays bounded in O(1) per hit.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def hit(self, key, capacity, period):
+        """Take a token from `key`; return 0 if allowed, else seconds until one is available"""
+        rate = capacity / period
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self.buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self.buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.MAX_KEYS:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheWindowCounter:
+    """Fixed-window counters in the default cache, shared across processes"""
+
+    def hit(self, key, capacity, period):
+        window = int(time.time() // period)
+        # Hash the key: usernames may contain characters some cache backends reject.
+        cache_key = f'rl:{hashlib.sha1(key.encode()).hexdigest()}:{window}'
+        if cache.add(cache_key, 1, timeout=period + 1):
+            count = 1
+        else:
+            try:
+                count = cache.incr(cache_key)
+            except ValueError:  # expired between add() and incr()
+                cache.add(cache_key, 1, timeout=period + 1)
+                count = 1
+        if count <= capacity:
+            return 0
+        return (window + 1) * period - time.time()
+
+
+local_buckets = LocalTokenBucket()
+cache_counters = CacheWindowCounter()
+
+
+def get_limiter():
+    return cache_counters if settings.RATELIMIT_BACKEND == 'cache' else local_buckets
+
+
+def client_ip(request):
+    """The client address; behind RATELIMIT_TRUSTED_PROXY_COUNT proxies, the one the outermost appended"""
+    if settings.RATELIMIT_TRUST_X_FORWARDED_FOR:
+        # Each proxy appends the address it received from, so only the last
+        # `count` entries are trustworthy; anything left of them is client-supplied.
+        forwarded = [entry.strip() for entry in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        count = settings.RATELIMIT_TRUSTED_PROXY_COUNT
+        if count > 0 and len(forwarded) >= count and forwarded[-count]:
+            return forwarded[-count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+KEY_FUNCTIONS = {
+    'ip': client_ip,
+    'username': lambda request: request.POST.get('username', '').strip().lower(),
+}
+
+
+def ratelimit(endpoint, keys=('ip',), methods=('POST',)):
+    """Answer 429 once any key's RATE_LIMITS['<endpoint>:<key>'] rate is exceeded"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                limiter = get_limiter()
+                for name in keys:
+                    value = KEY_FUNCTIONS[name](request)
+                    if not value:
+                        continue
+                    capacity, period = parse_rate(settings.RATE_LIMITS[f'{endpoint}:{name}'])
+                    wait = limiter.hit(f'{endpoint}:{name}:{value}', capacity, period)
+                    if wait:
+                        response = HttpResponse('Too many requests. Please try again later.', status=429,
+                                                content_type='text/plain')
+                        response['Retry-After'] = str(math.ceil(wait))
+                        return response
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,326 @@
+"""
+Precomputed internship and event recommendations for students.
+
+Scores for every (student, item) pair are computed as NumPy matrices, a
+chunk of students at a time, and only the top RECOMMENDATIONS_PER_KIND
+items per student and kind are stored in the Recommendation table. The
+student dashboard then reads them with one indexed query.
+
+Internships score on branch match with the poster, stipend, recency,
+duration fit for the student's semester and (for strong CGPAs) stipend;
+students below an internship's min_semester are never recommended it.
+Events score on how popular they are with the student's branch, how
+full they are, how soon they are and the student's past registrations;
+events the student already registered for, and full events, are skipped.
+
+refresh_recommendations() recomputes everything (nightly). With
+incremental=True it recomputes only students whose inputs changed since
+the last run (new students, new registrations, edits to branch, semester
+or CGPA logged in the ChangeLog, and students holding a recommendation
+that has since expired), and merges items posted since then into
+everyone else's stored top-k. If the log no longer reaches back to the
+last run, everything is recomputed.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .db_router import PRIMARY_DB
+from .models import ArchivedEventRegistration, ChangeLog, Event, EventRegistration, Internship, Recommendation, Student
+from .snapshot import CHANGELOG_OVERLAP, CHANGELOG_RETENTION, log_covers
+
+TABLE = 'student'
+CHUNK_SIZE = 500
+
+BRANCH_INDEX = {code: index for index, (code, _) in enumerate(Student.BRANCH_CHOICES)}
+
+INTERNSHIP_WEIGHTS = {'branch': 3.0, 'stipend': 1.0, 'recency': 1.0, 'duration': 1.0, 'cgpa_stipend': 1.0}
+EVENT_WEIGHTS = {'branch_share': 2.0, 'fill': 1.0, 'soon': 1.0, 'activity_fill': 0.5}
+
+
+def log_student_changes(ids):
+    """Record students whose branch, semester or CGPA may have changed"""
+    ChangeLog.objects.bulk_create(ChangeLog(table=TABLE, object_id=pk) for pk in ids)
+
+
+def _live(now):
+    """Recommendations whose item can still be shown"""
+    return Q(internship__is_active=True) | Q(event__is_active=True, event__event_date__gte=now)
+
+
+def _branch_codes(branches):
+    return np.array([BRANCH_INDEX.get(branch, -1) for branch in branches], dtype=np.int16)
+
+
+def load_students(student_ids=None):
+    """Student feature arrays: ids, branch, semester, cgpa, past registration count"""
+    students = Student.objects.all()
+    if student_ids is not None:
+        students = students.filter(pk__in=student_ids)
+    rows = list(students.order_by('pk').values_list('pk', 'branch', 'current_semester', 'cgpa'))
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+
+    past = defaultdict(int)
+    for model in (EventRegistration, ArchivedEventRegistration):
+        counts = model.objects.filter(student__isnull=False)
+        if student_ids is not None:
+            counts = counts.filter(student__in=student_ids)
+        for student_id, count in counts.values('student').annotate(n=Count('pk')).values_list('student', 'n'):
+            past[student_id] += count
+
+    return {
+        'ids': ids,
+        'branch': _branch_codes(row[1] for row in rows),
+        'semester': np.array([row[2] for row in rows], dtype=np.float32),
+        'cgpa': np.array([row[3] for row in rows], dtype=np.float32),
+        'past_registrations': np.array([past[pk] for pk in ids], dtype=np.float32),
+    }
+
+
+def load_internships(since=None):
+    """Active internship feature arrays (optionally only those posted after `since`)"""
+    internships = Internship.objects.filter(is_active=True)
+    if since is not None:
+        internships = internships.filter(posted_at__gt=since)
+    rows = list(internships.values_list('pk', 'posted_by__branch', 'min_semester', 'stipend', 'duration_months', 'posted_at'))
+    now = timezone.now()
+    return {
+        'ids': np.array([row[0] for row in rows], dtype=np.int64),
+        'branch': _branch_codes(row[1] for row in rows),
+        'min_semester': np.array([row[2] for row in rows], dtype=np.float32),
+        'stipend': np.array([float(row[3]) for row in rows], dtype=np.float32),
+        'duration': np.array([row[4] for row in rows], dtype=np.float32),
+        'age_days': np.array([(now - row[5]).total_seconds() / 86400 for row in rows], dtype=np.float32),
+    }
+
+
+def load_events(since=None):
+    """Upcoming event feature arrays plus registrant branch counts and (student, event) pairs"""
+    now = timezone.now()
+    events = Event.objects.filter(is_active=True, event_date__gte=now)
+    if since is not None:
+        events = events.filter(created_at__gt=since)
+    rows = list(events.values_list('pk', 'max_participants', 'event_date'))
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    position = {pk: index for index, pk in enumerate(ids.tolist())}
+
+    branch_counts = np.zeros((len(ids), len(BRANCH_INDEX)), dtype=np.float32)
+    registered = np.zeros(len(ids), dtype=np.float32)
+    pairs = []
+    registrations = EventRegistration.objects.filter(event__in=ids.tolist())
+    for event_id, student_id, branch in registrations.values_list('event', 'student', 'student__branch'):
+        index = position[event_id]
+        registered[index] += 1
+        if student_id is not None:
+            pairs.append((student_id, event_id))
+            if branch in BRANCH_INDEX:
+                branch_counts[index, BRANCH_INDEX[branch]] += 1
+
+    return {
+        'ids': ids,
+        'capacity': np.array([max(row[1], 1) for row in rows], dtype=np.float32),
+        'days_until': np.array([(row[2] - now).total_seconds() / 86400 for row in rows], dtype=np.float32),
+        'registered': registered,
+        'branch_counts': branch_counts,
+        'registrations': pairs,
+    }
+
+
+def score_internships(students, internships):
+    """(students x internships) score matrix; -inf where not eligible"""
+    w = INTERNSHIP_WEIGHTS
+    semester = students['semester'][:, None]
+    stipend = internships['stipend'] / (internships['stipend'] + 10000.0)  # saturates at 1
+    recency = np.exp(-internships['age_days'] / 30.0)
+    preferred_duration = np.where(semester >= 7, 6.0, 2.0)  # final years can take long internships
+    duration_fit = 1.0 - np.abs(internships['duration'][None, :] - preferred_duration) / 12.0
+
+    scores = (
+        w['branch'] * (students['branch'][:, None] == internships['branch'][None, :])
+        + w['stipend'] * stipend[None, :]
+        + w['recency'] * recency[None, :]
+        + w['duration'] * duration_fit
+        + w['cgpa_stipend'] * (students['cgpa'][:, None] / 10.0) * stipend[None, :]
+    )
+    scores[semester < internships['min_semester'][None, :]] = -np.inf
+    return scores
+
+
+def score_events(students, events):
+    """(students x events) score matrix; -inf for registered or full events"""
+    w = EVENT_WEIGHTS
+    totals = events['branch_counts'].sum(axis=1, keepdims=True)
+    branch_share = events['branch_counts'] / np.maximum(totals, 1.0)
+    known_branch = students['branch'] >= 0
+    student_share = np.zeros((len(students['ids']), len(events['ids'])), dtype=np.float32)
+    student_share[known_branch] = branch_share[:, students['branch'][known_branch]].T
+
+    fill = np.minimum(events['registered'] / events['capacity'], 1.0)
+    soon = np.exp(-np.maximum(events['days_until'], 0.0) / 14.0)
+    activity = np.minimum(np.log1p(students['past_registrations']) / np.log1p(10.0), 1.0)
+
+    scores = (
+        w['branch_share'] * student_share
+        + w['fill'] * fill[None, :]
+        + w['soon'] * soon[None, :]
+        + w['activity_fill'] * activity[:, None] * fill[None, :]
+    )
+    scores[:, events['registered'] >= events['capacity']] = -np.inf
+
+    if events['registrations']:
+        student_position = {pk: index for index, pk in enumerate(students['ids'].tolist())}
+        event_position = {pk: index for index, pk in enumerate(events['ids'].tolist())}
+        pairs = [(student_position[s], event_position[e]) for s, e in events['registrations'] if s in student_position]
+        if pairs:
+            rows, cols = np.array(pairs).T
+            scores[rows, cols] = -np.inf
+    return scores
+
+
+def top_k(scores, k):
+    """Per row, (column indices, scores) of the k best finite scores, best first"""
+    if scores.shape[1] == 0:
+        return [([], []) for _ in range(scores.shape[0])]
+    k = min(k, scores.shape[1])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    results = []
+    for columns, values in zip(best, best_scores):
+        keep = np.isfinite(values)
+        results.append((columns[keep].tolist(), values[keep].tolist()))
+    return results
+
+
+def _slice(students, start, stop):
+    return {name: values[start:stop] for name, values in students.items()}
+
+
+def _write(rows_by_student):
+    """Replace the stored recommendations of the given students"""
+    with transaction.atomic():
+        Recommendation.objects.filter(student__in=list(rows_by_student)).delete()
+        Recommendation.objects.bulk_create(
+            [row for rows in rows_by_student.values() for row in rows], batch_size=1000
+        )
+
+
+def _rows(student_id, kind, ranked, now):
+    return [
+        Recommendation(student_id=student_id, score=score, rank=rank, computed_at=now, **{f'{kind}_id': item_id})
+        for rank, (item_id, score) in enumerate(ranked, start=1)
+    ]
+
+
+def recompute(student_ids=None):
+    """Score all active items for the given students (all students if None); return students written"""
+    k = settings.RECOMMENDATIONS_PER_KIND
+    now = timezone.now()
+    students = load_students(student_ids)
+    internships = load_internships()
+    events = load_events()
+
+    for start in range(0, len(students['ids']), CHUNK_SIZE):
+        chunk = _slice(students, start, start + CHUNK_SIZE)
+        internship_top = top_k(score_internships(chunk, internships), k)
+        event_top = top_k(score_events(chunk, events), k)
+        rows_by_student = {}
+        for student_id, (i_cols, i_scores), (e_cols, e_scores) in zip(chunk['ids'].tolist(), internship_top, event_top):
+            rows_by_student[student_id] = (
+                _rows(student_id, 'internship', zip(internships['ids'][i_cols].tolist(), i_scores), now)
+                + _rows(student_id, 'event', zip(events['ids'][e_cols].tolist(), e_scores), now)
+            )
+        _write(rows_by_student)
+    return len(students['ids'])
+
+
+def merge_new_items(since, skip_students=()):
+    """Merge items posted after `since` into every other student's stored top-k"""
+    k = settings.RECOMMENDATIONS_PER_KIND
+    now = timezone.now()
+    internships = load_internships(since=since)
+    events = load_events(since=since)
+    if not len(internships['ids']) and not len(events['ids']):
+        return 0
+
+    student_ids = list(Student.objects.exclude(pk__in=list(skip_students)).values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(student_ids), CHUNK_SIZE):
+        chunk = load_students(student_ids[start:start + CHUNK_SIZE])
+        new = {
+            'internship': (internships['ids'], top_k(score_internships(chunk, internships), k)),
+            'event': (events['ids'], top_k(score_events(chunk, events), k)),
+        }
+        stored = defaultdict(lambda: defaultdict(list))
+        chunk_recommendations = Recommendation.objects.filter(student__in=chunk['ids'].tolist())
+        for rec in chunk_recommendations.filter(_live(now)):
+            stored[rec.student_id][rec.kind].append((rec.item_id, rec.score))
+        # Students who lose expired items are rewritten even if nothing new makes their top-k.
+        expired = set(chunk_recommendations.exclude(_live(now)).values_list('student', flat=True))
+
+        rows_by_student = {}
+        for position, student_id in enumerate(chunk['ids'].tolist()):
+            rows, changed = [], student_id in expired
+            for kind, (item_ids, ranked) in new.items():
+                columns, scores = ranked[position]
+                current = stored[student_id][kind]
+                candidates = current + list(zip(item_ids[columns].tolist(), scores))
+                best = sorted(candidates, key=lambda item: -item[1])[:k]
+                changed = changed or best != sorted(current, key=lambda item: -item[1])
+                rows.extend(_rows(student_id, kind, best, now))
+            if changed:
+                rows_by_student[student_id] = rows
+        if rows_by_student:
+            _write(rows_by_student)
+            updated += len(rows_by_student)
+    return updated
+
+
+def refresh_recommendations(incremental=False):
+    """Recompute recommendations; returns (students recomputed, students merged)"""
+    now = timezone.now()
+    last_run = Recommendation.objects.aggregate(last=Max('computed_at'))['last']
+    ChangeLog.objects.filter(table=TABLE, changed_at__lt=now - CHANGELOG_RETENTION).delete()
+    if not incremental or not log_covers(last_run, now):
+        return recompute(), 0
+
+    # Students whose own inputs changed: new students, new registrations and
+    # profile edits. Those holding an expired item are recomputed too, so the
+    # next best item takes its place.
+    stale = set(Student.objects.filter(recommendations__isnull=True).values_list('pk', flat=True))
+    stale.update(
+        EventRegistration.objects.filter(student__isnull=False, registration_date__gt=last_run)
+        .values_list('student', flat=True)
+    )
+    # Entries logged just before a run's computed_at may commit after it read the students.
+    stale.update(
+        ChangeLog.objects.using(PRIMARY_DB)
+        .filter(table=TABLE, changed_at__gte=last_run - CHANGELOG_OVERLAP)
+        .values_list('object_id', flat=True)
+    )
+    stale.update(Recommendation.objects.exclude(_live(now)).values_list('student', flat=True))
+    recomputed = recompute(sorted(stale)) if stale else 0
+    return recomputed, merge_new_items(last_run, skip_students=stale)
+
+
+def student_recommendations(student, limit=5):
+    """(internships, events) recommended to `student`, best first, in one query"""
+    recommendations = (
+        Recommendation.objects.filter(student=student)
+        .filter(_live(timezone.now()))
+        .select_related('internship', 'event')
+        .order_by('rank')
+    )
+    internships, events = [], []
+    for rec in recommendations:
+        target = internships if rec.internship_id else events
+        if len(target) < limit:
+            target.append(rec.internship or rec.event)
+    return internships, events
@@ -0,0 +1,169 @@
+"""
+Internship search: full-text matching, range filters and keyset pagination.
+
+The full-text index is created after `migrate` (see apps.py) because it is
+database specific:
+
+- SQLite: an external-content FTS5 table kept in sync by triggers
+- PostgreSQL: a GIN index over to_tsvector('english', ...) of the fields
+
+On other databases, or SQLite builds without FTS5, the search falls back
+to icontains. Pages are cut with a (posted_at, id) cursor instead of
+OFFSET, so every page costs the same however deep the student scrolls.
+"""
+
+import base64
+import re
+from datetime import datetime
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Internship
+
+SEARCH_FIELDS = ('company_name', 'position', 'description', 'requirements', 'location')
+PAGE_SIZE = 20
+
+FTS_TABLE = 'main_app_internship_fts'
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_SQLITE_FTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"{', '.join(SEARCH_FIELDS)}, content='main_app_internship', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON main_app_internship BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)}) "
+    f"VALUES (new.id, {', '.join('new.' + f for f in SEARCH_FIELDS)}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON main_app_internship BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_FIELDS)}) "
+    f"VALUES ('delete', old.id, {', '.join('old.' + f for f in SEARCH_FIELDS)}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON main_app_internship BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_FIELDS)}) "
+    f"VALUES ('delete', old.id, {', '.join('old.' + f for f in SEARCH_FIELDS)}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)}) "
+    f"VALUES (new.id, {', '.join('new.' + f for f in SEARCH_FIELDS)}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_PG_DOCUMENT = "to_tsvector('english', {})".format(
+    " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+)
+_PG_FTS = [f"CREATE INDEX IF NOT EXISTS internship_fts_idx ON main_app_internship USING GIN ({_PG_DOCUMENT})"]
+
+# alias -> whether the full-text index exists there
+_fts_available = {}
+
+
+def create_search_index(using='default', **kwargs):
+    """Create the full-text index on `using` if missing (post_migrate receiver)"""
+    connection = connections[using]
+    _fts_available.pop(using, None)
+    if connection.vendor == 'sqlite':
+        if FTS_TABLE in connection.introspection.table_names():
+            return
+        statements = _SQLITE_FTS
+    elif connection.vendor == 'postgresql':
+        statements = _PG_FTS
+    else:
+        return
+    try:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    except DatabaseError:
+        # e.g. SQLite compiled without FTS5; search falls back to icontains.
+        pass
+
+
+def _has_fts(using):
+    if using not in _fts_available:
+        connection = connections[using]
+        if connection.vendor == 'sqlite':
+            _fts_available[using] = FTS_TABLE in connection.introspection.table_names()
+        else:
+            _fts_available[using] = connection.vendor == 'postgresql'
+    return _fts_available[using]
+
+
+def _sqlite_match(query):
+    # Quote every word so user input can't inject FTS5 syntax; prefix-match the last.
+    terms = [f'"{token}"' for token in _TOKEN.findall(query)]
+    if not terms:
+        return None
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def full_text_filter(queryset, query):
+    """Restrict `queryset` to internships matching the free-text `query`"""
+    query = query.strip()
+    if not query:
+        return queryset
+    using = queryset.db
+    vendor = connections[using].vendor
+    if _has_fts(using) and vendor == 'sqlite':
+        match = _sqlite_match(query)
+        if match is None:
+            return queryset
+        return queryset.extra(
+            where=[f'main_app_internship.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'],
+            params=[match],
+        )
+    if _has_fts(using) and vendor == 'postgresql':
+        return queryset.extra(where=[f"{_PG_DOCUMENT} @@ websearch_to_tsquery('english', %s)"], params=[query])
+
+    condition = Q()
+    for word in _TOKEN.findall(query):
+        condition &= Q(*[Q(**{f'{field}__icontains': word}) for field in SEARCH_FIELDS], _connector=Q.OR)
+    return queryset.filter(condition)
+
+
+def encode_cursor(internship):
+    """Opaque cursor pointing just after `internship` in feed order"""
+    raw = f'{internship.posted_at.isoformat()}|{internship.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(posted_at, id) from a cursor, or None if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        posted_at, pk = raw.split('|')
+        return datetime.fromisoformat(posted_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def open_internships():
+    """Active internships still accepting applications"""
+    # Hide postings past their deadline even before the expiry sweep runs.
+    return Internship.objects.filter(is_active=True).filter(
+        Q(application_deadline__isnull=True) | Q(application_deadline__gte=timezone.localdate())
+    )
+
+
+def search_internships(query='', min_stipend=None, max_stipend=None, min_duration=None, max_duration=None,
+                       after=None, page_size=PAGE_SIZE):
+    """One page of active internships, newest first.
+
+    Returns (internships, next_cursor); next_cursor is None on the last page.
+    """
+    internships = open_internships().select_related('posted_by__profile__user')
+    internships = full_text_filter(internships, query or '')
+    if min_stipend is not None:
+        internships = internships.filter(stipend__gte=min_stipend)
+    if max_stipend is not None:
+        internships = internships.filter(stipend__lte=max_stipend)
+    if min_duration is not None:
+        internships = internships.filter(duration_months__gte=min_duration)
+    if max_duration is not None:
+        internships = internships.filter(duration_months__lte=max_duration)
+
+    position = decode_cursor(after) if after else None
+    if position is not None:
+        posted_at, pk = position
+        internships = internships.filter(Q(posted_at__lt=posted_at) | Q(posted_at=posted_at, pk__lt=pk))
+
+    page = list(internships.order_by('-posted_at', '-pk')[:page_size + 1])
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
@@ -0,0 +1,116 @@
+"""
+Signal receivers for the Alumni Connect Platform.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .cache import MODEL_NAMESPACES, bump_for_model
+from .db_router import PRIMARY_DB
+from .donor_cohorts import log_donation_changes
+from .jobs import enqueue
+from .mentorship_hours import add_session_hours, month_of, tracking_paused
+from .recommendations import log_student_changes
+from .tasks import generate_profile_thumbnails
+from . import models
+
+CACHED_MODELS = [User] + [getattr(models, name) for name in MODEL_NAMESPACES if hasattr(models, name)]
+
+
+def log_alumni_change(sender, instance, **kwargs):
+    """Feed the change log read by incremental analytics snapshots"""
+    models.ChangeLog.objects.create(table='alumni', object_id=instance.pk, deleted=kwargs['signal'] is post_delete)
+
+
+post_save.connect(log_alumni_change, sender=models.Alumni, dispatch_uid='changelog-alumni-save')
+post_delete.connect(log_alumni_change, sender=models.Alumni, dispatch_uid='changelog-alumni-delete')
+
+
+def log_donation_change(sender, instance, **kwargs):
+    """Feed the change log read by the donor cohort matrices"""
+    log_donation_changes([instance.pk], deleted=kwargs['signal'] is post_delete)
+
+
+post_save.connect(log_donation_change, sender=models.Donation, dispatch_uid='changelog-donation-save')
+post_delete.connect(log_donation_change, sender=models.Donation, dispatch_uid='changelog-donation-delete')
+
+
+def log_student_change(sender, instance, **kwargs):
+    """Feed the change log read by incremental recommendation refreshes"""
+    log_student_changes([instance.pk])
+
+
+post_save.connect(log_student_change, sender=models.Student, dispatch_uid='changelog-student-save')
+
+
+# Saves touching only these fields change nothing any cached page shows.
+UNCACHED_FIELDS = {'last_login'}
+
+
+def invalidate_cached_data(sender, **kwargs):
+    """Bump the cache namespaces that depend on the saved/deleted model"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS:
+        # update_last_login on every login would otherwise flush the alumni
+        # and student caches, ETags and analytics each time someone signs in.
+        return
+    # After commit, so nobody sees the new version (and refreshes from the
+    # change log) before the change and its log entry are visible.
+    transaction.on_commit(lambda: bump_for_model(sender))
+
+
+# Connected after the change log receivers above: those must write their
+# entry before the version moves.
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_cached_data, sender=model, dispatch_uid=f'cache-save-{model.__name__}')
+    post_delete.connect(invalidate_cached_data, sender=model, dispatch_uid=f'cache-delete-{model.__name__}')
+
+
+def detect_new_profile_picture(sender, instance, **kwargs):
+    """Flag profiles whose picture is being (re)uploaded in this save"""
+    picture = instance.profile_picture
+    if picture and not picture._committed:
+        instance.thumbnails_ready = False
+        instance._thumbnails_pending = True
+
+
+def queue_profile_thumbnails(sender, instance, **kwargs):
+    """Generate thumbnails for a freshly uploaded profile picture"""
+    if getattr(instance, '_thumbnails_pending', False):
+        instance._thumbnails_pending = False
+        enqueue(generate_profile_thumbnails, profile_id=instance.pk)
+
+
+pre_save.connect(detect_new_profile_picture, sender=models.Profile, dispatch_uid='thumbnails-detect')
+post_save.connect(queue_profile_thumbnails, sender=models.Profile, dispatch_uid='thumbnails-queue')
+
+
+def remember_session_hours(sender, instance, **kwargs):
+    """Note what an edited session counted for before, so post_save can move it"""
+    instance._counted_hours = None
+    if instance.pk and not tracking_paused():
+        instance._counted_hours = (
+            sender.objects.using(PRIMARY_DB).filter(pk=instance.pk).values_list('mentorship_id', 'session_date', 'duration_hours').first()
+        )
+
+
+def count_session_hours(sender, instance, **kwargs):
+    """Keep the monthly hour totals in step with saved sessions"""
+    if tracking_paused():
+        return
+    previous = getattr(instance, '_counted_hours', None)
+    if previous is not None:
+        mentorship_id, session_date, duration = previous
+        add_session_hours(mentorship_id, month_of(session_date), -duration, sessions=-1)
+    add_session_hours(instance.mentorship_id, month_of(instance.session_date), instance.duration_hours)
+
+
+def uncount_session_hours(sender, instance, **kwargs):
+    if not tracking_paused():
+        add_session_hours(instance.mentorship_id, month_of(instance.session_date), -instance.duration_hours, sessions=-1)
+
+
+pre_save.connect(remember_session_hours, sender=models.MentorshipSession, dispatch_uid='hours-remember')
+post_save.connect(count_session_hours, sender=models.MentorshipSession, dispatch_uid='hours-count')
+post_delete.connect(uncount_session_hours, sender=models.MentorshipSession, dispatch_uid='hours-uncount')
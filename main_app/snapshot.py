@@ -0,0 +1,280 @@
+"""
+Columnar snapshots of the alumni directory for offline analytics.
+
+export_snapshot() writes one NumPy .npy file per column under
+ANALYTICS_SNAPSHOT_DIR/alumni-<version>/ and points the CURRENT file at
+it. String columns are dictionary encoded: an int32 code array plus a
+<column>.categories.json list, so "group by company" is a bincount over
+the codes. load_snapshot() memory-maps the arrays, so analyses (and the
+admin analytics page) read the snapshot, never the live database.
+
+With incremental=True only the alumni listed in the ChangeLog since the
+previous snapshot are re-read (one pk__in query per chunk) and patched
+into a copy of the previous arrays. Existing dictionary codes are kept
+and new strings appended; a full export rebuilds the dictionaries.
+
+ChangeLog ids are handed out when an entry is inserted, not when its
+transaction commits, so on PostgreSQL an entry below a position already
+read can still show up. Entries logged within CHANGELOG_OVERLAP before
+the previous read are therefore looked at again; re-reading a row is
+harmless.
+
+Entries are kept for CHANGELOG_RETENTION (pruned by full exports and by
+the analytics dataset's full reads, so the log stays small even if
+exports never run). A reader whose last read is older than that may have
+missed pruned entries and reads everything again.
+
+With parquet=True an alumni.parquet file (dictionary-encoded Arrow
+columns, also memory-mappable) is written next to the .npy files; this
+needs pyarrow.
+"""
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .db_router import PRIMARY_DB
+from .models import Alumni, ChangeLog
+
+TABLE = 'alumni'
+CHUNK_SIZE = 500
+
+# column -> (ORM path, dtype); dtype None marks a dictionary-encoded string column
+COLUMNS = {
+    'id': ('pk', np.int64),
+    'batch_year': ('batch_year', np.int16),
+    'branch': ('branch', None),
+    'cgpa': ('cgpa', np.float32),
+    'work_experience': ('work_experience', np.int16),
+    'is_mentor': ('is_mentor', np.bool_),
+    'current_company': ('current_company', None),
+    'current_position': ('current_position', None),
+}
+
+KEEP_VERSIONS = 2
+# Longest a transaction that writes alumni (and so a ChangeLog entry) may stay open.
+CHANGELOG_OVERLAP = timedelta(minutes=5)
+CHANGELOG_RETENTION = timedelta(days=1)
+
+
+class Snapshot:
+    """Column arrays (memory-mapped when loaded from disk) plus their string dictionaries"""
+
+    def __init__(self, columns, categories, manifest):
+        self.columns = columns
+        self.categories = categories
+        self.manifest = manifest
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name):
+        """The string values of a dictionary-encoded column"""
+        return np.asarray(self.categories[name], dtype=object)[self.columns[name]]
+
+
+def _root(directory=None):
+    return directory or settings.ANALYTICS_SNAPSHOT_DIR
+
+
+def _normalise(value):
+    return (value or '').strip()
+
+
+def _encode(values, categories):
+    """Codes of `values` in `categories`, appending unseen strings to it"""
+    index = {value: code for code, value in enumerate(categories)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for position, value in enumerate(values):
+        value = _normalise(value)
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(categories)
+            categories.append(value)
+        codes[position] = code
+    return codes
+
+
+def _read_rows(queryset):
+    # The primary: rows named in the change log may not have reached a replica yet.
+    return list(queryset.using(PRIMARY_DB).order_by('pk').values_list(*(path for path, _ in COLUMNS.values())))
+
+
+def _to_columns(rows, categories):
+    columns = {}
+    for position, (name, (_, dtype)) in enumerate(COLUMNS.items()):
+        values = [row[position] for row in rows]
+        if dtype is None:
+            columns[name] = _encode(values, categories.setdefault(name, []))
+        else:
+            columns[name] = np.array(values, dtype=dtype)
+    return columns
+
+
+def read_columns(queryset, categories):
+    """Column arrays of the alumni in `queryset`, ordered by id; extends `categories`"""
+    return _to_columns(_read_rows(queryset), categories)
+
+
+def last_change():
+    """Position of the newest alumni ChangeLog entry (0 if none)"""
+    return ChangeLog.objects.using(PRIMARY_DB).filter(table=TABLE).aggregate(last=Max('pk'))['last'] or 0
+
+
+def changed_alumni(after, upto, read_at=None):
+    """Ids of alumni logged as changed or deleted in (after, upto]
+
+    `read_at` is when `after` was read: entries logged shortly before it
+    may have committed later, below `after`, and are included as well.
+    """
+    changed = Q(pk__gt=after)
+    if read_at is not None:
+        changed |= Q(changed_at__gte=read_at - CHANGELOG_OVERLAP)
+    log = ChangeLog.objects.using(PRIMARY_DB).filter(changed, table=TABLE, pk__lte=upto)
+    return set(log.values_list('object_id', flat=True))
+
+
+def log_covers(read_at, now):
+    """True if every entry needed to catch up from a read at `read_at` is still in the log"""
+    return read_at is not None and now - read_at <= CHANGELOG_RETENTION - CHANGELOG_OVERLAP
+
+
+def prune_changes(now):
+    """Delete alumni ChangeLog entries older than CHANGELOG_RETENTION"""
+    ChangeLog.objects.filter(table=TABLE, changed_at__lt=now - CHANGELOG_RETENTION).delete()
+
+
+def read_time(manifest):
+    """When the position of an exported snapshot was read (None for older exports)"""
+    return datetime.fromisoformat(manifest['read_at']) if manifest.get('read_at') else None
+
+
+def apply_changes(columns, categories, changed_ids):
+    """Re-read `changed_ids` and patch them into `columns`; returns (new columns, rows re-read)"""
+    if not changed_ids:
+        return columns, 0
+    ids = sorted(changed_ids)
+    rows = []
+    for start in range(0, len(ids), CHUNK_SIZE):
+        rows += _read_rows(Alumni.objects.filter(pk__in=ids[start:start + CHUNK_SIZE]))
+    fresh = _to_columns(rows, categories)
+    # Drop every changed row (deleted ones simply don't come back), then append the re-read ones.
+    keep = ~np.isin(columns['id'], np.array(ids, dtype=np.int64))
+    patched = {name: np.concatenate([columns[name][keep], fresh[name]]) for name in COLUMNS}
+    order = np.argsort(patched['id'], kind='stable')
+    return {name: values[order] for name, values in patched.items()}, len(rows)
+
+
+def load_snapshot(directory=None, mmap=True):
+    """The current snapshot, or None if none was exported yet"""
+    root = _root(directory)
+    try:
+        with open(os.path.join(root, 'CURRENT')) as current:
+            path = os.path.join(root, current.read().strip())
+        with open(os.path.join(path, 'manifest.json')) as manifest:
+            manifest = json.load(manifest)
+    except FileNotFoundError:
+        return None
+    columns, categories = {}, {}
+    for name, (_, dtype) in COLUMNS.items():
+        columns[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        if dtype is None:
+            with open(os.path.join(path, f'{name}.categories.json')) as handle:
+                categories[name] = json.load(handle)
+    return Snapshot(columns, categories, manifest)
+
+
+def _write(snapshot, root, parquet):
+    version = time.strftime('%Y%m%dT%H%M%S') + f'-{time.time_ns() % 1000000:06d}'
+    name = f'{TABLE}-{version}'
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for column, values in snapshot.columns.items():
+        np.save(os.path.join(path, f'{column}.npy'), np.ascontiguousarray(values))
+        if column in snapshot.categories:
+            with open(os.path.join(path, f'{column}.categories.json'), 'w') as handle:
+                json.dump(snapshot.categories[column], handle)
+    if parquet:
+        _write_parquet(snapshot, os.path.join(path, f'{TABLE}.parquet'))
+    with open(os.path.join(path, 'manifest.json'), 'w') as handle:
+        json.dump(snapshot.manifest, handle, indent=2)
+
+    # Readers follow CURRENT; replacing it is atomic, and files already
+    # memory-mapped from an older version stay valid until they are closed.
+    pointer = os.path.join(root, 'CURRENT.tmp')
+    with open(pointer, 'w') as handle:
+        handle.write(name)
+    os.replace(pointer, os.path.join(root, 'CURRENT'))
+
+    versions = sorted(entry for entry in os.listdir(root) if entry.startswith(f'{TABLE}-'))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return path
+
+
+def _write_parquet(snapshot, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrays = {}
+    for name, values in snapshot.columns.items():
+        if name in snapshot.categories:
+            arrays[name] = pa.DictionaryArray.from_arrays(np.asarray(values), pa.array(snapshot.categories[name]))
+        else:
+            arrays[name] = pa.array(np.asarray(values))
+    pq.write_table(pa.table(arrays), path)
+
+
+def export_snapshot(directory=None, incremental=False, parquet=False):
+    """Write a new snapshot; returns (path, rows, alumni re-read)"""
+    if parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError('parquet output requires pyarrow (pip install pyarrow)')
+    root = _root(directory)
+    os.makedirs(root, exist_ok=True)
+    # Read the log position before the rows: changes made while exporting
+    # are replayed by the next incremental run (re-reading a row is harmless).
+    read_at = timezone.now()
+    position = last_change()
+    previous = load_snapshot(root, mmap=False) if incremental else None
+    if previous is not None and not log_covers(read_time(previous.manifest), read_at):
+        previous = None  # entries it would need may have been pruned
+    if previous is None:
+        categories = {}
+        columns = read_columns(Alumni.objects.all(), categories)
+        reread = len(columns['id'])
+    else:
+        categories = {name: list(values) for name, values in previous.categories.items()}
+        columns, reread = apply_changes(
+            previous.columns, categories,
+            changed_alumni(previous.manifest['last_change'], position, read_time(previous.manifest)),
+        )
+
+    manifest = {
+        'table': TABLE,
+        'rows': int(len(columns['id'])),
+        'generated_at': timezone.now().isoformat(),
+        'last_change': position,
+        'read_at': read_at.isoformat(),
+        'incremental': previous is not None,
+        'columns': {name: ('dictionary' if dtype is None else np.dtype(dtype).name) for name, (_, dtype) in COLUMNS.items()},
+    }
+    path = _write(Snapshot(columns, categories, manifest), root, parquet)
+    # Consumed entries are no longer needed, except those the next run's overlap
+    # re-scans: an entry below `position` may not have committed yet.
+    ChangeLog.objects.filter(table=TABLE, pk__lte=position, changed_at__lt=read_at - CHANGELOG_OVERLAP).delete()
+    if previous is None:
+        prune_changes(read_at)
+    return path, manifest['rows'], reread
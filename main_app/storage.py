@@ -0,0 +1,152 @@
+"""
+Static files storage: content-hashed names, minified CSS/JS and
+precompressed (gzip/brotli) variants written at collectstatic time.
+"""
+
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz variants are written without it
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml')
+MIN_COMPRESS_SIZE = 256
+
+# Strings and url() are copied as they are; comments are dropped.
+_CSS_VERBATIM = re.compile(
+    r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'"""
+    r"""|url\(\s*(?:"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^)]*)\s*\)|/\*.*?\*/)""",
+    re.S | re.I,
+)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+# Only after a colon: the space in `.a :hover` is a descendant combinator.
+_CSS_COLON = re.compile(r':\s+')
+
+
+def _minify_css_code(code):
+    code = _CSS_SPACE.sub(' ', code)
+    code = _CSS_PUNCTUATION.sub(r'\1', code)
+    return _CSS_COLON.sub(':', code).replace(';}', '}')
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    minified, code = [], ''
+    for index, part in enumerate(_CSS_VERBATIM.split(source)):
+        if index % 2 == 0:
+            code += part
+        elif not part.startswith('/*'):
+            minified += [_minify_css_code(code), part]
+            code = ''
+    minified.append(_minify_css_code(code))
+    return ''.join(minified).strip()
+
+
+def minify_js(source):
+    """Conservatively minify JavaScript (line-level only, unless rjsmin is installed).
+
+    Indentation, blank lines and whole-line // comments are dropped; lines
+    inside multi-line template literals are left untouched.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        stripped = line if in_template else line.strip()
+        if not in_template and (not stripped or stripped.startswith('//')):
+            continue
+        lines.append(stripped)
+        if (line.count('`') - line.count('\\`')) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also minifies and precompresses.
+
+    collectstatic copies the sources, this storage minifies CSS/JS in
+    place, lets the manifest storage write content-hashed copies, then
+    writes `.gz` (and `.br` when brotli is installed) next to every
+    compressible output file for PrecompressedStaticMiddleware to serve.
+    """
+
+    # Fall back to unhashed URLs instead of erroring when collectstatic hasn't run.
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        for name in paths:
+            self._minify(name)
+        # Hash (and rewrite) the minified copies rather than the sources.
+        paths = {name: (self, name) for name in paths}
+
+        processed = set(paths)
+        for name, hashed_name, result in super().post_process(paths, dry_run=dry_run, **options):
+            if hashed_name and not isinstance(result, Exception):
+                processed.add(hashed_name)
+            yield name, hashed_name, result
+
+        for name in sorted(processed):
+            self._compress(name)
+
+    def _minify(self, name):
+        minifier = MINIFIERS.get(self._extension(name))
+        if minifier is None or '.min.' in name:
+            return
+        with self.open(name) as original:
+            source = original.read().decode('utf-8')
+        minified = minifier(source)
+        if len(minified) < len(source):
+            self.delete(name)
+            self._save(name, ContentFile(minified.encode('utf-8')))
+
+    def _compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+    @staticmethod
+    def _extension(name):
+        dot = name.rfind('.')
+        return name[dot:].lower() if dot != -1 else ''
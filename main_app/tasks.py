@@ -0,0 +1,78 @@
+"""
+Background tasks executed by the job queue worker (see jobs.py).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import bump
+from .donor_cohorts import log_donation_changes
+from .jobs import backoff_delay, enqueue, task
+from .models import Donation, EventRegistration, Mentorship
+from .notifications import NOTIFICATION_KINDS, BatchSendError, batched, render_notification, send_batch
+from .recommendations import refresh_recommendations
+from .thumbnails import build_profile_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@task(max_attempts=3)
+def generate_profile_thumbnails(profile_id):
+    """Build the thumbnails for a newly uploaded profile picture"""
+    build_profile_thumbnails(profile_id)
+
+
+@task
+def record_successful_payment(payment_id):
+    """Mark whatever a succeeded Stripe PaymentIntent paid for as paid"""
+    donations = Donation.objects.filter(payment_id=payment_id, is_verified=False)
+    # update() sends no signals: log the donations for the cohort matrices ourselves.
+    log_donation_changes(donations.values_list('pk', flat=True))
+    donations.update(is_verified=True)
+    Mentorship.objects.filter(payment_id=payment_id).update(payment_status=True)
+    EventRegistration.objects.filter(payment_id=payment_id).update(payment_status=True)
+    bump('donations', 'mentorships', 'registrations')
+
+
+@task
+def notify_students(kind, object_id):
+    """Fan-out: resolve the recipients of a new internship/event and queue one job per batch"""
+    model, resolve_recipients = NOTIFICATION_KINDS[kind][:2]
+    obj = model.objects.filter(pk=object_id).first()
+    if obj is None:
+        return
+    recipients = resolve_recipients(obj)
+    batches = batched(recipients, settings.NOTIFICATION_BATCH_SIZE)
+    for batch in batches:
+        enqueue(send_notification_batch, kind=kind, object_id=object_id, recipients=batch)
+    logger.info('Queued %s %s notifications in %s batches', len(recipients), kind, len(batches))
+
+
+@task(max_attempts=3)
+def send_notification_batch(kind, object_id, recipients):
+    """Send one batch of notifications over a single email connection"""
+    model = NOTIFICATION_KINDS[kind][0]
+    obj = model.objects.filter(pk=object_id).first()
+    if obj is None:
+        return
+    subject, body = render_notification(kind, obj)
+    try:
+        send_batch(subject, body, recipients)
+    except BatchSendError as error:
+        if len(error.unsent) == len(recipients):
+            raise  # nothing went out: retry this job as it is
+        # Retrying the job would resend to everyone before the failure: queue the rest instead.
+        logger.warning('Notification batch stopped after %s of %s: %s',
+                       len(recipients) - len(error.unsent), len(recipients), error.__cause__)
+        enqueue(send_notification_batch, run_at=timezone.now() + timedelta(seconds=backoff_delay(1)),
+                kind=kind, object_id=object_id, recipients=error.unsent)
+
+
+@task(max_attempts=2)
+def refresh_student_recommendations(incremental=True):
+    """Recompute stored student recommendations (see recommendations.py)"""
+    recomputed, merged = refresh_recommendations(incremental=incremental)
+    logger.info('Recommendations: %s students recomputed, %s updated with new items', recomputed, merged)
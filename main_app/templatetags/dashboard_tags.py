@@ -0,0 +1,15 @@
+from django import template
+
+from main_app.cache import data_version_token
+
+register = template.Library()
+
+
+@register.simple_tag
+def data_version(*namespaces):
+    """Token that changes whenever data in any of the given cache namespaces changes.
+
+    Used as a vary_on argument of {% cache %} so dashboard fragments are
+    invalidated by the same signals that bump the namespace versions.
+    """
+    return data_version_token(namespaces)
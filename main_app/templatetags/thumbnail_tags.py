@@ -0,0 +1,42 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from main_app.thumbnails import THUMBNAIL_SIZES, thumbnail_name
+
+register = template.Library()
+
+
+def _srcset(name, extension):
+    return ', '.join(
+        f'{default_storage.url(thumbnail_name(name, size, extension))} {size}w'
+        for size in THUMBNAIL_SIZES
+    )
+
+
+@register.simple_tag
+def profile_picture(profile, size=60, css_class='rounded-circle'):
+    """Lazy-loaded <picture> for a profile picture, served from its thumbnails.
+
+    Offers every thumbnail size as WebP with a JPEG fallback and lets the
+    browser pick by pixel density. Falls back to the original upload while
+    thumbnails are still being generated.
+    """
+    picture = profile.profile_picture
+    if not profile.thumbnails_ready:
+        return format_html(
+            '<img src="{}" alt="Profile" class="{}" width="{}" height="{}" loading="lazy" decoding="async">',
+            picture.url, css_class, size, size,
+        )
+
+    fallback = next((s for s in THUMBNAIL_SIZES if s >= size), THUMBNAIL_SIZES[-1])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}px">'
+        '<img src="{}" srcset="{}" sizes="{}px" alt="Profile" class="{}" width="{}" height="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        _srcset(picture.name, 'webp'), size,
+        default_storage.url(thumbnail_name(picture.name, fallback, 'jpg')),
+        _srcset(picture.name, 'jpg'), size,
+        css_class, size, size,
+    )
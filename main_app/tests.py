@@ -0,0 +1,64 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from .cache import get_or_compute_coalesced
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': LOCMEM, 'LOCATION': 'tests-default'},
+    'versions': {'BACKEND': LOCMEM, 'LOCATION': 'tests-versions'},
+})
+class CoalescedRecomputeTests(SimpleTestCase):
+    """get_or_compute_coalesced() under a burst of concurrent requests"""
+
+    concurrency = 100
+    compute_seconds = 0.2
+
+    def setUp(self):
+        self.name = f'coalesced_{time.time_ns()}'
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def compute(self):
+        with self.calls_lock:
+            self.calls += 1
+            value = self.calls
+        time.sleep(self.compute_seconds)
+        return value
+
+    def burst(self):
+        """Results of `concurrency` simultaneous lookups"""
+        barrier = threading.Barrier(self.concurrency)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(get_or_compute_coalesced(self.name, ['donations'], self.compute, timeout=60))
+
+        threads = [threading.Thread(target=request) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_expired_key_is_recomputed_once(self):
+        get_or_compute_coalesced(self.name, ['donations'], lambda: 'stale', timeout=0.01)
+        time.sleep(0.05)  # into the stale window
+
+        results = self.burst()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), self.concurrency)
+        # Everyone gets either the stale value or the single recomputation.
+        self.assertLessEqual(set(results), {'stale', 1})
+
+    def test_missing_key_is_computed_once(self):
+        results = self.burst()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1] * self.concurrency)
@@ -0,0 +1,63 @@
+"""
+Profile picture thumbnails.
+
+Every uploaded profile picture gets square thumbnails in THUMBNAIL_SIZES,
+each as WebP plus a JPEG fallback, stored beside the original:
+
+    profiles/jane.png -> profiles/jane_64.webp, profiles/jane_64.jpg, ...
+
+Generation runs in the background job queue (see tasks.py).
+"""
+
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .cache import bump_for_model
+
+THUMBNAIL_SIZES = (64, 128, 256)
+THUMBNAIL_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+)
+
+
+def thumbnail_name(name, size, extension):
+    """Storage name of the `size` px thumbnail of `name` in `extension` format"""
+    root, _ = os.path.splitext(name)
+    return f'{root}_{size}.{extension}'
+
+
+def generate_thumbnails(name, storage=default_storage):
+    """Write all thumbnail sizes/formats for the image stored at `name`"""
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    for size in THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for extension, image_format, save_options in THUMBNAIL_FORMATS:
+            buffer = BytesIO()
+            thumbnail.save(buffer, image_format, **save_options)
+            target = thumbnail_name(name, size, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def build_profile_thumbnails(profile_id):
+    """Generate thumbnails for a profile and mark them ready"""
+    from .models import Profile
+
+    profile = Profile.objects.filter(pk=profile_id).only('profile_picture').first()
+    if profile is None or not profile.profile_picture:
+        return False
+    generate_thumbnails(profile.profile_picture.name)
+    # update() rather than save(): no signals, and no race with a newer upload.
+    Profile.objects.filter(pk=profile_id, profile_picture=profile.profile_picture.name).update(thumbnails_ready=True)
+    bump_for_model(Profile)
+    return True
+
@@ -1,5 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, batch, live, views
+
+if settings.ASYNC_DASHBOARDS:
+    from . import async_views as dashboard_views
+else:
+    dashboard_views = views
 
 urlpatterns = [
     # Main pages
@@ -10,7 +16,7 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     
     # Alumni URLs
-    path('alumni/dashboard/', views.alumni_dashboard, name='alumni_dashboard'),
+    path('alumni/dashboard/', dashboard_views.alumni_dashboard, name='alumni_dashboard'),
     path('alumni/search/', views.alumni_search, name='alumni_search'),
     path('alumni/donations/', views.alumni_donations, name='alumni_donations'),
     path('alumni/events/', views.alumni_events, name='alumni_events'),
@@ -23,16 +29,26 @@ urlpatterns = [
     path('student/events/', views.student_events, name='student_events'),
     path('student/mentorship/', views.student_mentorship, name='student_mentorship'),
     path('student/internships/', views.student_internships, name='student_internships'),
+    path('events/capacity/stream/', live.event_capacity_stream, name='event_capacity_stream'),
     
     # Admin URLs
-    path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin/dashboard/', dashboard_views.admin_dashboard, name='admin_dashboard'),
     path('admin/alumni/', views.admin_alumni_management, name='admin_alumni_management'),
     path('admin/events/', views.admin_events, name='admin_events'),
     path('admin/funds/', views.admin_funds, name='admin_funds'),
+    path('admin/funds/cohorts/', views.admin_donor_cohorts, name='admin_donor_cohorts'),
     path('admin/mentorship/', views.admin_mentorship, name='admin_mentorship'),
+    path('admin/mentorship/hours/', views.admin_mentorship_hours, name='admin_mentorship_hours'),
+    path('admin/mentorship/hours/export/', views.admin_mentorship_hours_csv, name='admin_mentorship_hours_csv'),
+    path('admin/analytics/', views.admin_analytics, name='admin_analytics'),
     
     # Payment URLs
     path('payment/process/<int:donation_id>/', views.payment_process, name='payment_process'),
     path('payment/process/mentorship/<int:mentorship_id>/', views.payment_process, name='payment_process'),
     path('payment/webhook/', views.payment_webhook, name='payment_webhook'),
+
+    # JSON API
+    path('api/v1/batch/', batch.batch, name='api_batch'),
+    path('api/v1/<str:resource>/', api.resource_list, name='api_list'),
+    path('api/v1/<str:resource>/<int:pk>/', api.resource_detail, name='api_detail'),
 ]
@@ -2,8 +2,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.db.models import Q, Sum, Count
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 import json
@@ -14,11 +15,23 @@ from .models import (
     Profile, Alumni, Student, CollegeAdmin, Event, EventRegistration,
     Mentorship, Internship, Donation, MentorshipSession
 )
+from .analytics import analytics_summary
+from .archive import HISTORY_PAGE_SIZE, event_history, mentorship_history, mentorship_status_counts
+from .auth import session_role, set_session_role
+from .cache import get_or_compute, get_or_compute_coalesced
+from .conditional import conditional_listing
+from .donor_cohorts import GROUPS, donor_cohort_report
+from .ratelimit import ratelimit
+from .search import search_internships
+from .jobs import enqueue
+from .mentorship_hours import hours_report, parse_month, write_report_csv
+from .recommendations import student_recommendations
+from .tasks import notify_students, record_successful_payment, refresh_student_recommendations
 from .forms import (
     UserRegistrationForm, AlumniRegistrationForm, StudentRegistrationForm,
     AdminRegistrationForm, EventForm, MentorshipApplicationForm,
     MentorshipOfferForm, InternshipForm, DonationForm, AlumniSearchForm,
-    StudentMentorshipForm
+    StudentMentorshipForm, InternshipSearchForm
 )  
 
 def add_user(request):
@@ -39,6 +52,7 @@ def welcome(request):
     return render(request, 'welcome.html')
 
 
+@ratelimit('login', keys=('ip', 'username'))
 def user_login(request):
     """Handle user login"""
     if request.method == 'POST':
@@ -48,12 +62,13 @@ def user_login(request):
         
         user = authenticate(request, username=username, password=password)
         if user is not None:
-            try:
-                profile = Profile.objects.get(user=user, user_type=user_type)
+            # ProfileModelBackend already loaded the profile with the user.
+            profile = getattr(user, 'profile', None)
+            if profile is not None and profile.user_type == user_type:
                 login(request, user)
+                set_session_role(request, profile.user_type)
                 return redirect('dashboard')
-            except Profile.DoesNotExist:
-                messages.error(request, 'Invalid user type for this account.')
+            messages.error(request, 'Invalid user type for this account.')
         else:
             messages.error(request, 'Invalid username or password.')
     
@@ -66,6 +81,7 @@ def user_logout(request):
     return redirect('welcome')
 
 
+@ratelimit('register')
 def register(request, user_type):
     """Handle user registration"""
     if request.method == 'POST':
@@ -125,18 +141,16 @@ def register(request, user_type):
 @login_required
 def dashboard(request):
     """Main dashboard - redirects based on user type"""
-    try:
-        profile = Profile.objects.get(user=request.user)
-        
-        if profile.user_type == 'alumni':
-            return redirect('alumni_dashboard')
-        elif profile.user_type == 'student':
-            return redirect('student_dashboard')
-        elif profile.user_type == 'admin':
-            return redirect('admin_dashboard')
-    except Profile.DoesNotExist:
+    role = session_role(request)
+    
+    if role == 'alumni':
+        return redirect('alumni_dashboard')
+    elif role == 'student':
+        return redirect('student_dashboard')
+    elif role == 'admin':
+        return redirect('admin_dashboard')
+    elif role is None:
         messages.error(request, 'Profile not found.')
-        return redirect('welcome')
     
     return redirect('welcome')
 
@@ -150,10 +164,11 @@ def alumni_dashboard(request):
         messages.error(request, 'Alumni profile not found.')
         return redirect('welcome')
     
-    # Get recent activities
+    # Get recent activities (lazy querysets, only evaluated when the
+    # template's cached fragments need re-rendering)
     recent_donations = Donation.objects.filter(donor=alumni).order_by('-donation_date')[:5]
     recent_internships = Internship.objects.filter(posted_by=alumni).order_by('-posted_at')[:5]
-    mentorship_sessions = Mentorship.objects.filter(mentor=alumni).order_by('-created_at')[:5]
+    mentorship_sessions = Mentorship.objects.filter(mentor=alumni).select_related('student__profile__user').order_by('-created_at')[:5]
     
     context = {
         'alumni': alumni,
@@ -166,15 +181,18 @@ def alumni_dashboard(request):
 
 
 @login_required
+@conditional_listing('alumni')
 def alumni_search(request):
     """Search alumni by year and branch"""
     form = AlumniSearchForm(request.GET)
-    alumni_list = Alumni.objects.all()
+    alumni_list = Alumni.objects.select_related('profile__user')
+    filters = {}
     
     if form.is_valid():
         branch = form.cleaned_data.get('branch')
         batch_year = form.cleaned_data.get('batch_year')
         search_query = form.cleaned_data.get('search_query')
+        filters = {'branch': branch, 'batch_year': batch_year, 'search_query': search_query}
         
         if branch:
             alumni_list = alumni_list.filter(branch=branch)
@@ -189,7 +207,7 @@ def alumni_search(request):
     
     context = {
         'form': form,
-        'alumni_list': alumni_list,
+        'alumni_list': get_or_compute('alumni_search', ['alumni'], lambda: list(alumni_list), params=filters),
     }
     
     return render(request, 'alumni/search.html', context)
@@ -229,24 +247,27 @@ def alumni_donations(request):
 
 
 @login_required
+@conditional_listing('events', 'registrations', time_bucket=60)
 def alumni_events(request):
     """View and register for events"""
-    events = Event.objects.filter(is_active=True, event_date__gte=timezone.now()).order_by('event_date')
+    events = get_or_compute('upcoming_events', ['events', 'registrations'], lambda: list(
+        Event.objects.filter(is_active=True, event_date__gte=timezone.now())
+        .annotate(registered_count=Count('eventregistration'))
+        .order_by('event_date')
+    ), timeout=60)
     
-    # Get user registrations
-    user_profile = Profile.objects.get(user=request.user)
-    registrations = []
+    # Ids of the events the user registered for (one query, looked up per event in the template)
+    role = session_role(request)
+    registrations = EventRegistration.objects.none()
     
-    if user_profile.user_type == 'alumni':
-        alumni = Alumni.objects.get(profile=user_profile)
-        registrations = EventRegistration.objects.filter(alumni=alumni)
-    elif user_profile.user_type == 'student':
-        student = Student.objects.get(profile=user_profile)
-        registrations = EventRegistration.objects.filter(student=student)
+    if role == 'alumni':
+        registrations = EventRegistration.objects.filter(alumni__profile__user=request.user)
+    elif role == 'student':
+        registrations = EventRegistration.objects.filter(student__profile__user=request.user)
     
     context = {
         'events': events,
-        'registrations': registrations,
+        'registered_event_ids': set(registrations.values_list('event_id', flat=True)),
     }
     
     return render(request, 'alumni/events.html', context)
@@ -273,8 +294,8 @@ def alumni_mentorship(request):
     else:
         form = MentorshipOfferForm()
     
-    # Get mentorship offers and sessions
-    mentorship_offers = Mentorship.objects.filter(mentor=alumni).order_by('-created_at')
+    # Get mentorship offers and sessions (including archived ones)
+    mentorship_offers = mentorship_history(mentor=alumni)
     
     context = {
         'form': form,
@@ -300,6 +321,8 @@ def alumni_internships(request):
             internship = form.save(commit=False)
             internship.posted_by = alumni
             internship.save()
+            enqueue(notify_students, kind='internship', object_id=internship.pk)
+            enqueue(refresh_student_recommendations)
             messages.success(request, 'Internship posted successfully!')
             return redirect('alumni_internships')
     else:
@@ -326,13 +349,16 @@ def student_dashboard(request):
         return redirect('welcome')
     
     # Get student activities
-    mentorship_applications = Mentorship.objects.filter(student=student).order_by('-created_at')[:5]
-    event_registrations = EventRegistration.objects.filter(student=student).order_by('-registration_date')[:5]
+    mentorship_applications = Mentorship.objects.filter(student=student).select_related('mentor__profile__user').order_by('-created_at')[:5]
+    event_registrations = EventRegistration.objects.filter(student=student).select_related('event').order_by('-registration_date')[:5]
+    recommended_internships, recommended_events = student_recommendations(student)
     
     context = {
         'student': student,
         'mentorship_applications': mentorship_applications,
         'event_registrations': event_registrations,
+        'recommended_internships': recommended_internships,
+        'recommended_events': recommended_events,
     }
     
     return render(request, 'student/dashboard.html', context)
@@ -387,8 +413,8 @@ def student_mentorship(request):
     else:
         form = StudentMentorshipForm()
     
-    # Get student's mentorship applications
-    mentorship_applications = Mentorship.objects.filter(student=student).order_by('-created_at')
+    # Get student's mentorship applications (including archived ones)
+    mentorship_applications = mentorship_history(student=student)
     
     context = {
         'form': form,
@@ -399,17 +425,42 @@ def student_mentorship(request):
 
 
 @login_required
+@conditional_listing('internships', 'alumni')
 def student_internships(request):
-    """View available internships"""
-    internships = Internship.objects.filter(is_active=True).order_by('-posted_at')
+    """Search active internships (full-text, stipend/duration filters, keyset pages)"""
+    form = InternshipSearchForm(request.GET or None)
+    filters = form.search_filters() if form.is_valid() else {}
+    internships, next_cursor = search_internships(after=request.GET.get('after'), **filters)
+
+    params = request.GET.copy()
+    params.pop('after', None)
+    next_url = None
+    if next_cursor:
+        params['after'] = next_cursor
+        next_url = '?' + params.urlencode()
+        params.pop('after')
     
     context = {
+        'form': form,
         'internships': internships,
+        'next_url': next_url,
+        'first_url': '?' + params.urlencode() if request.GET.get('after') else None,
     }
     
     return render(request, 'student/internships.html', context)
 
 
+# Independent aggregate queries behind the admin dashboard stat cards
+ADMIN_STATS_NAMESPACES = ['alumni', 'students', 'events', 'donations', 'mentorships']
+ADMIN_STATS_QUERIES = {
+    'total_alumni': lambda: Alumni.objects.count(),
+    'total_students': lambda: Student.objects.count(),
+    'total_events': lambda: Event.objects.count(),
+    'total_donations': lambda: Donation.objects.aggregate(total=Sum('amount'))['total'] or 0,
+    'active_mentorships': lambda: Mentorship.objects.filter(status='active').count(),
+}
+
+
 @login_required
 def admin_dashboard(request):
     """Admin dashboard"""
@@ -419,20 +470,16 @@ def admin_dashboard(request):
         messages.error(request, 'Admin profile not found.')
         return redirect('welcome')
     
-    # Get statistics
-    total_alumni = Alumni.objects.count()
-    total_students = Student.objects.count()
-    total_events = Event.objects.count()
-    total_donations = Donation.objects.aggregate(total=Sum('amount'))['total'] or 0
-    active_mentorships = Mentorship.objects.filter(status='active').count()
+    # Get statistics (evaluated lazily: the template only calls this when
+    # its cached stats fragment is missing)
+    def stats():
+        return get_or_compute_coalesced('admin_dashboard_stats', ADMIN_STATS_NAMESPACES, lambda: {
+            name: query() for name, query in ADMIN_STATS_QUERIES.items()
+        })
     
     context = {
         'admin': admin,
-        'total_alumni': total_alumni,
-        'total_students': total_students,
-        'total_events': total_events,
-        'total_donations': total_donations,
-        'active_mentorships': active_mentorships,
+        'stats': stats,
     }
     
     return render(request, 'admin/dashboard.html', context)
@@ -499,16 +546,19 @@ def admin_events(request):
             event = form.save(commit=False)
             event.created_by = admin
             event.save()
+            enqueue(notify_students, kind='event', object_id=event.pk)
+            enqueue(refresh_student_recommendations)
             messages.success(request, 'Event created successfully!')
             return redirect('admin_events')
     else:
         form = EventForm()
     
-    events = Event.objects.all().order_by('-created_at')
+    events = Paginator(event_history(), HISTORY_PAGE_SIZE).get_page(request.GET.get('page'))
     
     context = {
         'form': form,
         'events': events,
+        'total_events': events.paginator.count,
     }
     
     return render(request, 'admin/events.html', context)
@@ -524,7 +574,10 @@ def admin_funds(request):
         return redirect('welcome')
     
     donations = Donation.objects.all().order_by('-donation_date')
-    total_funds = Donation.objects.aggregate(total=Sum('amount'))['total'] or 0
+    total_funds = get_or_compute_coalesced(
+        'admin_funds_total', ['donations'],
+        lambda: Donation.objects.aggregate(total=Sum('amount'))['total'] or 0,
+    )
     
     context = {
         'donations': donations,
@@ -534,6 +587,42 @@ def admin_funds(request):
     return render(request, 'admin/funds.html', context)
 
 
+@login_required
+def admin_donor_cohorts(request):
+    """Repeat-donation rates, time to second gift and lifetime value per donor cohort"""
+    if session_role(request) != 'admin':
+        messages.error(request, 'Admin profile not found.')
+        return redirect('welcome')
+    
+    report, elapsed_ms = donor_cohort_report(request.GET.get('group_by'))
+    
+    context = {
+        'report': report,
+        'groups': GROUPS,
+        'group_label': GROUPS[report['group_by']],
+        'elapsed_ms': elapsed_ms,
+    }
+    
+    return render(request, 'admin/donor_cohorts.html', context)
+
+
+@login_required
+def admin_analytics(request):
+    """Admin alumni analytics (in-memory columnar dataset, see analytics.py)"""
+    if session_role(request) != 'admin':
+        messages.error(request, 'Admin profile not found.')
+        return redirect('welcome')
+    
+    summary, elapsed_ms = analytics_summary()
+    
+    context = {
+        'summary': summary,
+        'elapsed_ms': elapsed_ms,
+    }
+    
+    return render(request, 'admin/analytics.html', context)
+
+
 @login_required
 def admin_mentorship(request):
     """Admin mentorship monitoring"""
@@ -543,8 +632,9 @@ def admin_mentorship(request):
         messages.error(request, 'Admin profile not found.')
         return redirect('welcome')
     
-    mentorships = Mentorship.objects.all().order_by('-created_at')
-    mentorship_stats = Mentorship.objects.values('status').annotate(count=Count('id'))
+    mentorships = Paginator(mentorship_history(), HISTORY_PAGE_SIZE).get_page(request.GET.get('page'))
+    # Live and archived rows, like the list below
+    mentorship_stats = get_or_compute_coalesced('admin_mentorship_stats', ['mentorships'], mentorship_status_counts)
     
     context = {
         'mentorships': mentorships,
@@ -554,6 +644,39 @@ def admin_mentorship(request):
     return render(request, 'admin/mentorship.html', context)
 
 
+@login_required
+def admin_mentorship_hours(request):
+    """Monthly mentorship hours per mentor and mentorship vs. the planned hours_per_month"""
+    if session_role(request) != 'admin':
+        messages.error(request, 'Admin profile not found.')
+        return redirect('welcome')
+    
+    month = parse_month(request.GET.get('month'))
+    mentors, mentorships = hours_report(month)
+    
+    context = {
+        'month': month,
+        'mentors': mentors,
+        'mentorships': mentorships,
+    }
+    
+    return render(request, 'admin/mentorship_hours.html', context)
+
+
+@login_required
+def admin_mentorship_hours_csv(request):
+    """CSV export of the monthly mentorship hours report"""
+    if session_role(request) != 'admin':
+        messages.error(request, 'Admin profile not found.')
+        return redirect('welcome')
+    
+    month = parse_month(request.GET.get('month'))
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="mentorship-hours-{month:%Y-%m}.csv"'
+    write_report_csv(response, month)
+    return response
+
+
 def payment_process(request, donation_id=None, mentorship_id=None):
     """Handle payment processing"""
     if donation_id:
@@ -575,6 +698,11 @@ def payment_process(request, donation_id=None, mentorship_id=None):
             description=description,
         )
         
+        # Remember the intent so the webhook can match the payment
+        payable = donation if donation_id else mentorship
+        payable.payment_id = intent.id
+        payable.save(update_fields=['payment_id'])
+        
         context = {
             'client_secret': intent.client_secret,
             'stripe_publishable_key': settings.STRIPE_PUBLISHABLE_KEY,
@@ -590,6 +718,7 @@ def payment_process(request, donation_id=None, mentorship_id=None):
 
 
 @csrf_exempt
+@ratelimit('payment_webhook')
 def payment_webhook(request):
     """Handle payment webhooks"""
     payload = request.body
@@ -606,7 +735,7 @@ def payment_webhook(request):
     
     if event['type'] == 'payment_intent.succeeded':
         payment_intent = event['data']['object']
-        # Update payment status in database
-        # This would need to be implemented based on your payment tracking
+        # Update payment status in the background so Stripe gets a fast 2xx
+        enqueue(record_successful_payment, payment_id=payment_intent['id'])
         
     return JsonResponse({'status': 'success'})
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Run the Alumni Connect Platform under an ASGI server (uvicorn).
+Async dashboards are enabled by default when started this way.
+
+Usage: python run_asgi.py [--host 0.0.0.0] [--port 8000] [--workers 4]
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the platform under uvicorn')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alumni_platform.settings')
+    os.environ.setdefault('ASYNC_DASHBOARDS', 'True')
+
+    try:
+        import uvicorn  # pyright: ignore[reportMissingImports]
+    except ImportError:
+        print("❌ uvicorn is not installed. Install it with: pip install uvicorn")
+        sys.exit(1)
+
+    from decouple import config  # pyright: ignore[reportMissingImports]
+
+    multiproc_dir = config('PROMETHEUS_MULTIPROC_DIR', default='')
+    if multiproc_dir:
+        # Metric files left by the previous run's workers would be added to this run's totals.
+        # Only those are removed: the directory may be shared with (or be) something else.
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+    print("Starting Alumni Connect Platform (ASGI)...")
+    print(f"Server will be available at: http://{args.host}:{args.port}/")
+    print("Press Ctrl+C to stop the server")
+
+    uvicorn.run('alumni_platform.asgi:application', host=args.host, port=args.port, workers=args.workers)